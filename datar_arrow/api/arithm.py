@@ -1,6 +1,7 @@
 from __future__ import annotations
 import math
 
+import pyarrow as pa
 import pyarrow.compute as pc
 from datar.apis.base import (
     ceiling,
@@ -32,6 +33,7 @@ from datar.apis.base import (
     quantile,
     proportions,
 )
+from ..arrow_ext import _ordered_dictionary
 from ..utils import (
     is_scalar,
     make_array,
@@ -156,15 +158,28 @@ def _scale(x, center=True, scale_=True):
     return x
 
 
+def _level_at(x: pa.DictionaryArray, index: pa.Scalar) -> pa.Scalar:
+    """The level of an ordered factor at the index, NA for NA"""
+    if not index.is_valid:
+        return pa.scalar(None, x.dictionary.type)
+    return x.dictionary[index.as_py()]
+
+
 @min_.register(object, backend="arrow")
 @wrap_arrow_result
 def _min_(x, na_rm: bool = False):
+    ordered = _ordered_dictionary(x)
+    if ordered is not None:
+        return _level_at(ordered, pc.min(ordered.indices, skip_nulls=na_rm))
     return pc.min(x, skip_nulls=na_rm)
 
 
 @max_.register(object, backend="arrow")
 @wrap_arrow_result
 def _max_(x, na_rm: bool = False):
+    ordered = _ordered_dictionary(x)
+    if ordered is not None:
+        return _level_at(ordered, pc.max(ordered.indices, skip_nulls=na_rm))
     return pc.max(x, skip_nulls=na_rm)
 
 
@@ -224,10 +239,17 @@ def _exp(x):
     return pc.exp(x)
 
 
+# Bases with a dedicated single-pass kernel
+_LOG_KERNELS = {math.e: pc.ln, 2: pc.log2, 10: pc.log10}
+
+
 @log.register(object, backend="arrow")
 @wrap_arrow_result
 def _log(x, base: float = math.e):
-    return pc.divide(pc.log10(x), pc.log10(base))
+    kernel = _LOG_KERNELS.get(base) if is_scalar(base) else None
+    if kernel is not None:
+        return kernel(x)
+    return pc.logb(x, base)
 
 
 @log2.register(object, backend="arrow")
@@ -31,6 +31,7 @@ from datar.apis.base import (
     as_numeric,
 )
 
+from ..lookup import LookupSet
 from ..utils import is_scalar, make_array, wrap_arrow_result
 from ..arrow_ext import DatarArray
 from .constants import NULL
@@ -65,6 +66,10 @@ def _is_integer(x: Any) -> bool:
 @is_element.register(object, backend="arrow")
 @wrap_arrow_result
 def _is_element(x: Any, y: Any) -> bool:
+    if isinstance(y, LookupSet):
+        out = y.contains(x)
+        return out[0] if is_scalar(x) else out
+
     if isinstance(x, DatarArray):
         x = x.storage
     return pc.is_in(x, make_array(y).storage)
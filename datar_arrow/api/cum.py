@@ -1,4 +1,8 @@
-import numpy as np
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import pyarrow as pa
 import pyarrow.compute as pc
 from datar.apis.base import (
     cummax,
@@ -7,24 +11,75 @@ from datar.apis.base import (
     cumsum,
 )
 from ..utils import wrap_arrow_result, make_array
+from ..arrow_ext import DatarArray
+
+
+def _cumulative(
+    kernel: Callable,
+    x: Any,
+    nan_as_na: bool = False,
+) -> pa.Array:
+    """Run an arrow cumulative kernel on x
+
+    Nulls are not skipped, so that, like in R, every element after the
+    first NA is NA. Chunked arrays are passed to the kernel as they are,
+    which carries the running state over the chunk boundaries.
+
+    Args:
+        kernel: The cumulative compute function
+        x: The values
+        nan_as_na: Whether to propagate NaN like NA, as the min/max
+            kernels skip NaN. Elements after a NaN are still NaN, not NA,
+            unless there is also an NA before them, like R.
+
+    Returns:
+        The cumulative values
+    """
+    if isinstance(x, DatarArray):
+        x = x.storage
+    elif not isinstance(x, pa.ChunkedArray):
+        x = make_array(x).storage
+
+    seen_na = None
+    if pa.types.is_boolean(x.type) or pa.types.is_null(x.type):
+        # logicals (and NAs only) are integers, like R
+        x = x.cast("int64")
+    elif nan_as_na and pa.types.is_floating(x.type):
+        seen_na = pc.cumulative_max(pc.is_null(x).cast(pa.int8()))
+        x = pc.if_else(pc.is_nan(x), pa.scalar(None, x.type), x)
+
+    out = kernel(x, skip_nulls=False)
+    if seen_na is not None:
+        # the NAs that come from NaN only are NaN
+        out = pc.if_else(
+            pc.and_(pc.is_null(out), pc.equal(seen_na, 0)),
+            pa.scalar(float("nan"), out.type),
+            out,
+        )
+    if isinstance(out, pa.ChunkedArray):
+        out = out.combine_chunks()
+    return out
 
 
 @cummax.register(object, backend="arrow")
+@wrap_arrow_result
 def _cummax(x):
-    return make_array(np.maximum.accumulate(x))
+    return _cumulative(pc.cumulative_max, x, nan_as_na=True)
 
 
 @cummin.register(object, backend="arrow")
+@wrap_arrow_result
 def _cummin(x):
-    return make_array(np.minimum.accumulate(x))
+    return _cumulative(pc.cumulative_min, x, nan_as_na=True)
 
 
 @cumprod.register(object, backend="arrow")
+@wrap_arrow_result
 def _cumprod(x):
-    return make_array(np.cumprod(x))
+    return _cumulative(pc.cumulative_prod, x)
 
 
 @cumsum.register(object, backend="arrow")
 @wrap_arrow_result
 def _cumsum(x):
-    return pc.cumulative_sum(x)
+    return _cumulative(pc.cumulative_sum, x)
@@ -1,6 +1,7 @@
 """Implement factor using pyarrow's dictionary array"""
 from __future__ import annotations
 
+import numpy as np
 import pyarrow as pa
 import pyarrow.compute as pc
 from datar.apis.base import (
@@ -14,7 +15,128 @@ from datar.apis.base import (
     is_ordered,
 )
 from ..utils import make_array, wrap_arrow_result
-from ..arrow_ext import DatarArray
+from ..arrow_ext import DatarArray, _ordered_dictionary
+
+
+def _dictionary_array(x) -> pa.DictionaryArray | None:
+    """The dictionary array of a factor or a dictionary-encoded DatarArray"""
+    if isinstance(x, pa.DictionaryArray):
+        return x
+    if isinstance(x, DatarArray):
+        return x._dictionary_array
+    return None
+
+
+def _recode(x: pa.DictionaryArray, levels: pa.Array) -> pa.DictionaryArray:
+    """Re-encode a dictionary array with the given levels, mapping only the
+    dictionary, and reusing the indices if the levels are the same"""
+    if x.dictionary.equals(levels):
+        return x
+    codes = pc.index_in(x.dictionary, value_set=levels)
+    return pa.DictionaryArray.from_arrays(codes.take(x.indices), levels)
+
+
+def _sort_levels(x: pa.DictionaryArray) -> pa.DictionaryArray:
+    """Sort the levels of a dictionary array, like R"""
+    order = pc.array_sort_indices(x.dictionary).to_numpy()
+    if np.array_equal(order, np.arange(len(order))):
+        return x
+
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return pa.DictionaryArray.from_arrays(
+        pa.array(rank, type=x.indices.type).take(x.indices),
+        x.dictionary.take(order),
+    )
+
+
+def _used_levels(x: pa.DictionaryArray) -> pa.Array:
+    """The levels of a dictionary array that are used, in their order"""
+    used = np.zeros(len(x.dictionary), dtype=bool)
+    used[pc.unique(x.indices).drop_null().to_numpy()] = True
+    return x.dictionary.filter(used)
+
+
+def _relabel(x: pa.DictionaryArray, labels) -> pa.DictionaryArray:
+    """Rename the levels, merging the ones with the same label, like R
+
+    A single label is a prefix for labels numbered from 1.
+    """
+    nlevels = len(x.dictionary)
+    labels = make_array(labels).storage
+    if len(labels) == 1 and nlevels != 1:
+        labels = pa.array([f"{labels[0]}{i + 1}" for i in range(nlevels)])
+    if len(labels) != nlevels:
+        raise ValueError(
+            f"Invalid `labels`; length {len(labels)} should be 1 or {nlevels}"
+        )
+
+    uniq = pc.unique(labels)
+    if len(uniq) == nlevels:
+        return pa.DictionaryArray.from_arrays(x.indices, labels)
+    codes = pc.index_in(labels, value_set=uniq)
+    return pa.DictionaryArray.from_arrays(codes.take(x.indices), uniq)
+
+
+def _as_character(x: pa.Array) -> pa.StringArray:
+    """Format the values of x as strings, logicals as TRUE/FALSE like R"""
+    if pa.types.is_boolean(x.type):
+        return pc.if_else(x, "TRUE", "FALSE")
+    return x.cast(pa.string())
+
+
+def _levels_type(xs: list[pa.DictionaryArray]) -> pa.DataType | None:
+    """The common type of the levels of the dictionary arrays
+
+    Integers of different widths are combined as int64. Other different
+    types are combined as strings, R's levels are always strings.
+    """
+    types = {x.dictionary.type for x in xs} - {pa.null()}
+    if len(types) == 1:
+        return types.pop()
+    if not types:
+        return None
+    if all(pa.types.is_integer(type_) for type_ in types):
+        return pa.int64()
+    return pa.string()
+
+
+def _cast_levels(levels: pa.Array, type_: pa.DataType | None) -> pa.Array:
+    """Cast the levels to the common type from _levels_type()"""
+    if type_ is None or levels.type == type_:
+        return levels
+    if pa.types.is_string(type_):
+        return _as_character(levels)
+    return levels.cast(type_)
+
+
+def _combine_factors(xs) -> pa.DictionaryArray:
+    """Concatenate factors with their levels unified, without decoding them
+
+    The levels are the ones of the first factor, followed by the new ones
+    of the others in order, like R's `c()` on factors. Only the indices are
+    remapped and concatenated. The result is ordered if all the factors are
+    ordered with the same levels. Levels of different types are cast to a
+    common one first, see _levels_type().
+    """
+    xs = [_dictionary_array(x) for x in xs]
+    type_ = _levels_type(xs)
+    ordered = all(x.type.ordered for x in xs) and all(
+        x.dictionary.equals(xs[0].dictionary) for x in xs[1:]
+    )
+    xs = [
+        x
+        if x.type.ordered == ordered
+        and x.type.index_type == pa.int32()
+        and type_ in (None, x.dictionary.type)
+        else pa.DictionaryArray.from_arrays(
+            x.indices.cast(pa.int32()),
+            _cast_levels(x.dictionary, type_),
+            ordered=ordered,
+        )
+        for x in xs
+    ]
+    return pa.chunked_array(xs).unify_dictionaries().combine_chunks()
 
 
 @factor.register(object, backend="arrow")
@@ -28,32 +150,59 @@ def _factor(
     ordered=False,
     nmax=None,
 ) -> pa.DictionaryArray:
+    out = _encode([] if x is None else x, levels, exclude, nmax)
+    if labels is not None:
+        out = _relabel(out, labels)
     if ordered:
-        raise NotImplementedError("ordered factor is not supported yet")
+        out = pa.DictionaryArray.from_arrays(out.indices, out.dictionary, ordered=True)
+    return out
 
-    if x is None:
-        return make_array([]).storage.dictionary_encode()
 
-    if levels is None and exclude is None:
-        return make_array(x).storage.dictionary_encode()
+def _encode(x, levels, exclude, nmax) -> pa.DictionaryArray:
+    """Encode x as a dictionary array with the given levels
 
-    x = make_array(x).storage
-    if levels is None:
-        levels = x.unique().drop_null()
-    else:
+    Without the levels, the used levels of a factor are kept in their order,
+    and the distinct values of other data are sorted, like R (but in the
+    byte order for strings). The data is hashed at most once: the dictionary
+    of a factor or of an encoded DatarArray is reused, with only the levels
+    mapped, and the indices kept as they are if the levels are the same.
+    """
+    encoded = _dictionary_array(x)
+    if levels is not None:
         levels = make_array(levels).storage
 
+    if encoded is None:
+        x = make_array(x).storage
+        if levels is not None and exclude is None:
+            encoded = pa.DictionaryArray.from_arrays(pc.index_in(x, levels), levels)
+        else:
+            encoded = x.dictionary_encode()
+
+    if levels is None:
+        if _is_factor(x):
+            levels = _used_levels(encoded)
+        else:
+            encoded = _sort_levels(encoded)
+            levels = encoded.dictionary
     if exclude is not None:
         exclude = make_array(exclude).storage
         levels = levels.filter(pc.invert(pc.is_in(levels, exclude)))
 
-    indices = pc.index_in(x, levels)
-    return pa.DictionaryArray.from_arrays(indices, levels)
+    if nmax is not None and len(levels) > nmax:
+        raise ValueError(f"Too many levels ({len(levels)}), more than `nmax` ({nmax}).")
+    return _recode(encoded, levels)
 
 
 @ordered.register(object, backend="arrow")
-def _ordered(x):
-    raise NotImplementedError("ordered factor is not supported yet")
+def _ordered(x, levels=None, labels=None, exclude=None, nmax=None) -> DatarArray:
+    return _factor(
+        x,
+        levels=levels,
+        labels=labels,
+        exclude=exclude,
+        ordered=True,
+        nmax=nmax,
+    )
 
 
 @levels.register(object, backend="arrow")
@@ -79,11 +228,17 @@ def _nlevels_dictionary_array(x) -> int:
 
 @droplevels.register(pa.DictionaryArray, backend="arrow")
 def _droplevels_dictionary_array(x: pa.DictionaryArray) -> DatarArray:
-    values = x.dictionary.take(x.indices)
-    lvls = x.dictionary.filter(
-        pc.is_in(x.dictionary, values.unique().drop_null())
-    )
-    return _factor(values, levels=lvls)
+    return _factor(x, ordered=x.type.ordered)
+
+
+@droplevels.register(pa.ChunkedArray, backend="arrow")
+def _droplevels_chunked_array(x: pa.ChunkedArray) -> DatarArray:
+    # factor batches, i.e. from a table column
+    if not pa.types.is_dictionary(x.type):
+        raise NotImplementedError("droplevels on non-factor is not supported")
+    if x.num_chunks == 0:
+        return _droplevels_dictionary_array(x.combine_chunks())
+    return _droplevels_dictionary_array(_combine_factors(x.chunks))
 
 
 @droplevels.register(DatarArray, backend="arrow")
@@ -91,11 +246,7 @@ def _droplevels_datar_array(x: DatarArray) -> DatarArray:
     if x.dictionary is None:
         raise NotImplementedError("droplevels on non-factor is not supported")
 
-    values = x.storage
-    lvls = x.dictionary.filter(
-        pc.is_in(x.dictionary, values.unique().drop_null())
-    )
-    return _factor(values, levels=lvls)
+    return _factor(x, ordered=_is_ordered(x))
 
 
 @is_factor.register(object, backend="arrow")
@@ -109,7 +260,7 @@ def _is_factor(x) -> bool:
 
 @is_ordered.register(object, backend="arrow")
 def _is_ordered(x) -> bool:
-    return False
+    return _ordered_dictionary(x) is not None
 
 
 @as_factor.register(object, backend="arrow")
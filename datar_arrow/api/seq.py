@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 from datar.core.utils import logger
 from datar.apis.base import (
     rep,
@@ -18,7 +19,16 @@ from datar.apis.base import (
     seq_len,
     match,
 )
-from ..utils import is_null, make_array, is_scalar, wrap_arrow_result
+from ..arrow_ext import DatarArray, _combined, _rearrange, _reversed
+from ..lookup import LookupSet
+from .factor import _as_character, _combine_factors
+from ..utils import (
+    is_null,
+    make_array,
+    is_scalar,
+    wrap_arrow_result,
+    wrap_arrow_value,
+)
 
 
 @rep.register(object, backend="arrow")
@@ -67,21 +77,35 @@ def _rep(
     return make_array(x[:length], dtype=xtype)
 
 
+def _c_part(x) -> pa.Array:
+    """An argument of c_() as an array, factors kept as dictionary arrays"""
+    if isinstance(x, pa.ChunkedArray):
+        x = x.combine_chunks()
+    if isinstance(x, pa.DictionaryArray):
+        return x
+    if isinstance(x, DatarArray):
+        return x.storage if x.dictionary is None else x._dictionary_array
+    if isinstance(x, pa.Array) or is_scalar(x):
+        return make_array(x).storage
+    return c_(
+        *x,
+        __backend="arrow",  # type: ignore
+        __ast_fallback="normal",  # type: ignore
+    ).storage
+
+
 @c_.register(object, backend="arrow")
 @wrap_arrow_result
 def _c(*args):
+    parts = [_c_part(xi) for xi in args]
+    if parts and all(isinstance(part, pa.DictionaryArray) for part in parts):
+        # factors are combined with their levels unified
+        return _combine_factors(parts)
+
     return pa.concat_arrays(
         [
-            (
-                make_array(xi).storage
-                if is_scalar(xi)
-                else c_(
-                    *xi,
-                    __backend="arrow",  # type: ignore
-                    __ast_fallback="normal",  # type: ignore
-                ).storage
-            )
-            for xi in args
+            part.dictionary_decode() if isinstance(part, pa.DictionaryArray) else part
+            for part in parts
         ]
     )
 
@@ -100,11 +124,20 @@ def _lengths(x) -> pa.IntegerArray:
 
 @order.register(object, backend="arrow")
 def _order(x, decreasing: bool = False, na_last: bool = True):
+    x = make_array(x)
+    if x.dictionary is not None:
+        # factors are ordered by their levels, using the indices only
+        out = pc.array_sort_indices(
+            x.indices,
+            order="descending" if decreasing else "ascending",
+            null_placement="at_end" if na_last else "at_start",
+        )
+        return make_array(out.cast(pa.int64()))
+
     and_ = not na_last and decreasing
     or_ = not na_last or decreasing
     na = -np.inf if or_ and not and_ else np.inf
 
-    x = make_array(x)
     xtype = x.type
     x = np.where(is_null(x), na, x)
     out = np.argsort(x)
@@ -121,7 +154,7 @@ def _sort(x, decreasing: bool = False, na_last: bool = True):
         __ast_fallback="normal",  # type: ignore
         __backend="arrow",  # type: ignore
     )
-    return x.take(idx)
+    return wrap_arrow_value(_rearrange(x, lambda arr: arr.take(idx.storage)))
 
 
 @rank.register(object, backend="arrow")
@@ -140,8 +173,16 @@ def _rank(x, na_last: bool = True, ties_method: str = "average"):
 
 
 @rev.register(object, backend="arrow")
+@wrap_arrow_result
 def _rev(x):
-    return make_array(x)[::-1]
+    if isinstance(x, pa.ChunkedArray):
+        return _combined(
+            pa.chunked_array(
+                [_reversed(chunk) for chunk in reversed(x.chunks)],
+                type=x.type,
+            )
+        )
+    return _rearrange(make_array(x), _reversed)
 
 
 @sample.register(object, backend="arrow")
@@ -243,10 +284,89 @@ def _seq_len_int(length_out):
     return make_array(np.arange(length_out) + 1)
 
 
+def _match_types(x: pa.Array, table: pa.Array) -> tuple[pa.Array, pa.Array | None]:
+    """Coerce x and table to a common type, as R's match() does
+
+    Numbers and logicals are compared as numbers, and as strings when
+    either side is strings. The table is None if the values of x cannot
+    be compared with it.
+    """
+    if x.type == table.type:
+        return x, table
+    if pa.types.is_null(table.type):
+        return x, table.cast(x.type)
+    if pa.types.is_null(x.type):
+        return x.cast(table.type), table
+
+    try:
+        if pa.types.is_string(x.type) or pa.types.is_string(table.type):
+            return _as_character(x), _as_character(table)
+        if _is_number(x.type) and _is_number(table.type):
+            # Integers are compared by the kernel directly, but not
+            # unsigned ones out of the range of the signed ones
+            if pa.types.is_uint64(x.type) or pa.types.is_uint64(table.type):
+                return (
+                    x.cast(pa.float64(), safe=False),
+                    table.cast(pa.float64(), safe=False),
+                )
+            return x, table
+        return x, table.cast(x.type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return x, None
+
+
+def _is_number(type_: pa.DataType) -> bool:
+    """Whether a type is numeric or logical"""
+    return (
+        pa.types.is_integer(type_)
+        or pa.types.is_floating(type_)
+        or pa.types.is_boolean(type_)
+    )
+
+
+def _match_lookup(x: pa.Array, table: LookupSet) -> pa.Array:
+    """The positions of x in a lookup set, with x and the values of the set
+    coerced to a common type by _match_types()"""
+    x, values = _match_types(x, table.values)
+    if values is None:
+        return pa.nulls(len(x), pa.int64())
+    if values.type == table.values.type:
+        return table.index(x)
+
+    # The values are coerced (i.e. numbers to strings), so find the
+    # distinct values matched, and their positions by the set
+    pos = pc.index_in(x, options=pc.SetLookupOptions(values, skip_nulls=False))
+    out = table.index(table.values.take(pos))
+    return pc.if_else(pc.is_null(pos), pa.scalar(None, out.type), out)
+
+
 @match.register(object, backend="arrow")
+@wrap_arrow_result
 def _match(x, table, nomatch=-1):
-    sorter = np.argsort(table)
-    searched = np.searchsorted(table, x, sorter=sorter).ravel()
-    out = sorter.take(searched, mode="clip")
-    out[~np.isin(x, table)] = nomatch
-    return make_array(out)
+    x = make_array(x)
+    encoded = x._dictionary_array
+    if encoded is None:
+        x = x.storage
+    else:
+        # Look up the distinct values only, with NA as an extra one
+        x = pa.concat_arrays(
+            [encoded.dictionary, pa.nulls(1, encoded.dictionary.type)]
+        )
+        indices = encoded.indices.fill_null(len(encoded.dictionary))
+    if isinstance(table, LookupSet):
+        out = _match_lookup(x, table)
+    else:
+        x, table = _match_types(x, make_array(table).storage)
+        if table is None:
+            # Nothing can match
+            out = pa.nulls(len(x), pa.int32())
+        else:
+            # The positions of the first occurrences in table, NA matching NA
+            out = pc.index_in(
+                x,
+                options=pc.SetLookupOptions(table, skip_nulls=False),
+            )
+    if encoded is not None:
+        out = out.take(indices)
+    out = out.cast(pa.int64())
+    return out if nomatch is None else out.fill_null(nomatch)
@@ -1,7 +1,6 @@
 from __future__ import annotations
-from typing import List
+from typing import Any
 
-import numpy as np
 import pyarrow as pa
 import pyarrow.compute as pc
 from datar.apis.base import (
@@ -22,71 +21,176 @@ from datar.apis.base import (
 )
 
 from .constants import NA
+from .factor import _combine_factors, _dictionary_array, _is_factor
+from ..lookup import LookupSet
+from ..outer import _collect_blocks, outer_blocks
 from ..utils import make_array, is_null, is_scalar, wrap_arrow_result
-from ..arrow_ext import DatarArray
+from ..arrow_ext import DatarArray, _combined, _rearrange, _subtract
+
+
+def _logical_chunks(x: Any) -> list[pa.Array]:
+    """The chunks of x as booleans, with NaN being NA"""
+    x = _as_arrow(x)
+    chunks = x.chunks if isinstance(x, pa.ChunkedArray) else [x]
+    out = []
+    for chunk in chunks:
+        if pa.types.is_floating(chunk.type):
+            chunk = pc.if_else(pc.is_nan(chunk), None, chunk)
+        if not pa.types.is_boolean(chunk.type):
+            chunk = chunk.cast(pa.bool_())
+        out.append(chunk)
+    return out
+
+
+def _reduce_logical(x: Any, na_rm: bool, decisive: bool) -> bool | None:
+    """Reduce x like R's all/any, chunk by chunk
+
+    The reduction stops at the first chunk with the decisive value (False
+    for all, True for any). Without `na_rm`, the result is NA if there is
+    no decisive value but any NA, otherwise the opposite of the decisive
+    value.
+    """
+    if isinstance(x, pa.Scalar):
+        x = x.as_py()
+    if is_scalar(x):
+        x = [x]
+
+    kernel = pc.any if decisive else pc.all
+    seen_na = False
+    for chunk in _logical_chunks(x):
+        if chunk.null_count == len(chunk):
+            # nothing but NA, no need to look at the values
+            seen_na = seen_na or (len(chunk) > 0 and not na_rm)
+            continue
+        out = kernel(chunk, skip_nulls=na_rm, min_count=0).as_py()
+        if out is decisive:
+            return decisive
+        seen_na = seen_na or out is None
+
+    return NA if seen_na else not decisive
 
 
 @all_.register(object, backend="arrow")
-@wrap_arrow_result
-def _all_(x):
-    # If there is any NA, return NA
-    if _any_na(x):
-        return NA
-    return pc.all(make_array(x).cast("bool"))
+def _all_(x, na_rm: bool = False) -> bool | None:
+    return _reduce_logical(x, na_rm, False)
 
 
 @any_.register(object, backend="arrow")
-@wrap_arrow_result
-def _any_(x) -> bool | pa.BooleanScalar:
-    if isinstance(x, pa.BooleanScalar):
-        return x.as_py() is True
-    if is_scalar(x):
-        return x is True
-    return pc.any(make_array(x).cast("bool"))
+def _any_(x, na_rm: bool = False) -> bool | None:
+    return _reduce_logical(x, na_rm, True)
 
 
 @any_na.register(object, backend="arrow")
 def _any_na(x) -> bool:
-    return _any_(is_null(x))
+    if isinstance(x, pa.Scalar):
+        x = x.as_py()
+    if is_scalar(x):
+        return bool(is_null(x))
+
+    x = _as_arrow(x)
+    if x.null_count > 0:
+        return True
+    if pa.types.is_floating(x.type):
+        return pc.any(pc.is_nan(x), min_count=0).as_py()
+    return False
+
+
+def _as_arrow(x: Any) -> pa.Array | pa.ChunkedArray:
+    """Get the arrow array of x, keeping chunked arrays chunked"""
+    if isinstance(x, DatarArray):
+        return x.storage
+    if isinstance(x, pa.ChunkedArray):
+        return x
+    return make_array(x).storage
+
+
+def _chain(*parts: pa.Array | pa.ChunkedArray) -> pa.ChunkedArray:
+    """Chain arrays of the same type without copying"""
+    return pa.chunked_array(
+        [
+            chunk
+            for part in parts
+            for chunk in (part.chunks if isinstance(part, pa.ChunkedArray) else [part])
+        ],
+        type=parts[0].type,
+    )
 
 
 @append.register(object, backend="arrow")
+@wrap_arrow_result
 def _append(x, values, after: int = -1):
-    x = make_array(x)
+    factors = _is_factor(x) and _is_factor(values)
+    if factors:
+        x = _dictionary_array(x)
+        values = _dictionary_array(values)
+    else:
+        x = _as_arrow(x)
+        values = _as_arrow(values)
+
     if after is None:
         after = 0
     elif after < 0:
-        after += len(x) + 1
+        after = max(after + len(x) + 1, 0)
     else:
-        after += 1
-    return make_array(np.insert(x, after, values), dtype=x.type)
+        after = min(after + 1, len(x))
 
+    if factors:
+        # in the index space, with the levels unified
+        return _combine_factors([x.slice(0, after), values, x.slice(after)])
 
-@outer.register(object, backend="arrow")
-def _outer(x, y, fun="*") -> List[pa.Array]:
-    if fun == "*":
-        return [make_array(o) for o in (np.outer(x, y))]
+    if values.type != x.type:
+        if pa.types.is_null(values.type):
+            values = values.cast(x.type)
+        elif pa.types.is_null(x.type):
+            x = x.cast(values.type)
+        else:
+            try:
+                values = values.cast(x.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                # i.e. floats appended to integers
+                x = x.cast(values.type)
+
+    # the slices are views, only the final concatenation copies the data
+    return _chain(x.slice(0, after), values, x.slice(after)).combine_chunks()
 
-    if isinstance(fun, str):  # pragma: no cover
-        fun = getattr(pc, fun, None) or getattr(np, fun)
 
-    kwargs = {}
-    if getattr(fun, "_pipda_functype", None) in (
-        "pipeable",
-        "verb",
-    ):  # pragma: no cover
-        kwargs["__ast_fallback"] = "normal"
-    return [
-        make_array(fun(xi, make_array(y), **kwargs)) for xi in make_array(x)
-    ]
+@outer.register(object, backend="arrow")
+@wrap_arrow_result
+def _outer(x, y, fun="*") -> pa.FixedSizeListArray:
+    # One row for each element of x, see datar_arrow.outer.outer_blocks()
+    x = make_array(x)
+    y = make_array(y)
+    return _collect_blocks(outer_blocks(x, y, fun), len(x), len(y))
 
 
 @diff.register(object, backend="arrow")
+@wrap_arrow_result
 def _diff(x, lag: int = 1, differences: int = 1):
-    if lag != 1:
-        raise ValueError("lag argument not supported")
-    x = make_array(x)
-    return make_array(np.diff(x, n=differences), dtype=x.type)
+    lag = int(lag)
+    if lag == 0 or differences < 1:
+        raise ValueError(
+            "`lag` must be a non-zero integer and `differences` a positive one"
+        )
+
+    x = _as_arrow(x)
+    if pa.types.is_boolean(x.type) or (
+        pa.types.is_integer(x.type) and x.type != pa.int64()
+    ):
+        # Subtract signed 64-bit integers, so that the unsigned and the
+        # narrow ones do not wrap around
+        x = x.cast(pa.int64())
+
+    # x[lag:] - x[:-lag] on zero-copy slices. Unlike pairwise_diff, this
+    # runs on chunked arrays too, and needs no slicing of the leading NAs.
+    # A negative lag subtracts the first -lag elements from the last ones,
+    # as the slicing does.
+    for _ in range(differences):
+        size = max(len(x) - lag, 0) if lag > 0 else min(-lag, len(x))
+        x = _subtract(x.slice(len(x) - size), x.slice(0, size))
+
+    if isinstance(x, pa.ChunkedArray):
+        x = x.combine_chunks()
+    return x
 
 
 @duplicated.register(object, backend="arrow")
@@ -112,29 +216,67 @@ def _duplicated(x, incomparables=None, from_last: bool = False):
     return make_array(out, dtype="bool")
 
 
+def _set_values(x: Any) -> pa.Array | pa.ChunkedArray:
+    """The values of x for the set operations
+
+    Chunked arrays are not concatenated. For dictionary-encoded values
+    (factors), these are the distinct values in the order of their first
+    appearance, so that only the indices are hashed.
+    """
+    if isinstance(x, LookupSet):
+        return x.values
+
+    if isinstance(x, DatarArray):
+        x = x.storage if x._dictionary_array is None else x._dictionary_array
+    elif not isinstance(x, (pa.Array, pa.ChunkedArray)):
+        x = make_array(x).storage
+
+    if isinstance(x, pa.DictionaryArray):
+        return x.dictionary.take(pc.unique(x.indices))
+    if pa.types.is_dictionary(x.type):
+        return pc.unique(x).dictionary_decode()
+    return x
+
+
+def _unify_types(x: Any, y: Any) -> tuple[Any, Any]:
+    """Cast the values of nulls (i.e. from an empty list) to the type of
+    the other ones"""
+    if pa.types.is_null(x.type):
+        x = x.cast(y.type)
+    elif pa.types.is_null(y.type):
+        y = y.cast(x.type)
+    return x, y
+
+
+def _distinct_in(x: Any, y: Any, invert: bool) -> pa.Array:
+    """The distinct values of x that are (not) in y, in the order of
+    their first appearance in x"""
+    x = pc.unique(_set_values(x))
+    if isinstance(y, LookupSet):
+        found = y.contains(x)
+    else:
+        x, y = _unify_types(x, _set_values(y))
+        found = pc.is_in(x, value_set=y)
+    return x.filter(pc.invert(found) if invert else found)
+
+
 @intersect.register(object, backend="arrow")
 @wrap_arrow_result
 def _intersect(x, y):
-    x = make_array(x)
-    y = make_array(y)
-    idx = pc.index_in(y.storage, x.storage).drop_null()
-    return x.take(idx)
+    return _distinct_in(x, y, invert=False)
 
 
 @setdiff.register(object, backend="arrow")
 @wrap_arrow_result
 def _setdiff(x, y):
-    x = make_array(x)
-    y = make_array(y)
-    idx = pc.indices_nonzero(pc.invert(pc.is_in(x.storage, y.storage)))
-    return x.storage.take(idx).unique()
+    return _distinct_in(x, y, invert=True)
 
 
 @setequal.register(object, backend="arrow")
 def _setequal(x, y):
-    x = make_array(x).storage.unique().sort()
-    y = make_array(y).storage.unique().sort()
-    return x.equals(y)
+    # No need to sort: the same number of distinct values, all of x in y
+    x, y = _unify_types(pc.unique(_set_values(x)), pc.unique(_set_values(y)))
+    return len(x) == len(y) and pc.all(pc.is_in(x, value_set=y), min_count=0).as_py()
 
 
 @unique.register(object, backend="arrow")
@@ -148,17 +290,39 @@ def _unique(x):
 @union.register(object, backend="arrow")
 @wrap_arrow_result
 def _union(x, y):
-    x = make_array(x)
-    y = make_array(y)
-    out = pa.concat_arrays([x.storage, y.storage])
-    return out.unique()
+    if _is_factor(x) and _is_factor(y):
+        # the distinct indices of the factors, with their levels unified
+        out = _combine_factors([x, y])
+        return pa.DictionaryArray.from_arrays(
+            pc.unique(out.indices),
+            out.dictionary,
+            ordered=out.type.ordered,
+        )
+
+    x, y = _unify_types(_set_values(x), _set_values(y))
+    return pc.unique(_chain(x, y))
+
+
+def _head_size(x: Any, n: int) -> int:
+    """The number of elements kept by head/tail, all but the last/first
+    -n ones for a negative n, like R"""
+    n = int(n)
+    return min(n, len(x)) if n >= 0 else max(len(x) + n, 0)
 
 
 @head.register(object, backend="arrow")
+@wrap_arrow_result
 def _head(x, n: int = 6):
-    return make_array(x)[:n]
+    if not isinstance(x, pa.ChunkedArray):
+        x = make_array(x)
+    size = _head_size(x, n)
+    return _combined(_rearrange(x, lambda arr: arr.slice(0, size)))
 
 
 @tail.register(object, backend="arrow")
+@wrap_arrow_result
 def _tail(x, n: int = 6):
-    return make_array(x)[-n:]
+    if not isinstance(x, pa.ChunkedArray):
+        x = make_array(x)
+    size = _head_size(x, n)
+    return _combined(_rearrange(x, lambda arr: arr.slice(len(arr) - size, size)))
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import string
+from functools import lru_cache
+from typing import Any, Callable
 
 import numpy as np
 import pyarrow as pa
@@ -28,15 +30,13 @@ from datar.apis.base import (
     nzchar,
 )
 from ..utils import (
-    broadcast_arrays,
     is_null,
     is_scalar,
     make_array,
     wrap_arrow_result,
 )
 
-if TYPE_CHECKING:  # pragma: no cover
-    from ..arrow_ext import DatarArray
+from ..arrow_ext import DatarArray
 
 
 def _warn_more_pat_or_rep(pattern, fun, arg="pattern"):
@@ -56,33 +56,292 @@ def _warn_more_pat_or_rep(pattern, fun, arg="pattern"):
     return pattern[0]
 
 
+def _dictionary_of(x: Any) -> pa.DictionaryArray | None:
+    """The dictionary array behind x if it is a factor, otherwise None"""
+    if isinstance(x, DatarArray):
+        return x._dictionary_array
+    if isinstance(x, pa.DictionaryArray):
+        return x
+    return None
+
+
+def _on_levels(fun: Callable, x: Any, *args: Any) -> pa.Array:
+    """Apply a function on the strings of x
+
+    For a factor, the function is applied to the levels only and the
+    results are taken by the indices, so that the cost of the function
+    depends on the number of levels, not on the length of x.
+
+    Args:
+        fun: The function taking a string array and the arguments, and
+            returning an array of the same length
+        x: The strings
+        *args: The arguments passed to fun. Arrays are the arguments for
+            each element of x, with which fun is applied to all the
+            elements.
+
+    Returns:
+        The result of fun for all the elements of x
+    """
+    dictarr = _dictionary_of(x)
+    if (
+        dictarr is None
+        or len(dictarr.dictionary) >= len(dictarr)
+        or any(isinstance(arg, pa.Array) for arg in args)
+    ):
+        return fun(make_array(x, dtype=str).storage, *args)
+
+    levels = dictarr.dictionary.cast(pa.string())
+    return fun(levels, *args).take(dictarr.indices)
+
+
+def _size(x: Any) -> int:
+    """The number of the strings in x, without decoding a factor"""
+    return 1 if is_scalar(x) else len(x)
+
+
+def _vectorize_pattern(pattern, size, fun, arg="pattern"):
+    """Get the pattern or replacement to be used for each element of x
+
+    Args:
+        pattern: The pattern or the replacement
+        size: The number of the strings
+        fun: The name of the function, used in the warning
+        arg: The name of the argument, used in the warning
+
+    Returns:
+        A set of patterns as is (any of them matches), an array if there
+        is one pattern for each element of x, otherwise a single pattern
+        (the first one, with a warning if there are more)
+    """
+    if isinstance(pattern, (set, frozenset)):
+        return pattern
+    if not is_scalar(pattern) and len(pattern) > 1 and len(pattern) == size:
+        return make_array(pattern, dtype=str).storage
+    return _warn_more_pat_or_rep(pattern, fun, arg)
+
+
+def _apply_by_pattern(
+    fun: Callable,
+    x: pa.Array,
+    *args: Any,
+    otype: pa.DataType,
+) -> pa.Array:
+    """Apply a kernel to x with per-element arguments
+
+    The elements of x sharing the same arguments are handled together by
+    one kernel call with scalar arguments. The elements with any NA
+    argument give NA.
+
+    Args:
+        fun: The function taking x and the scalar arguments
+        x: The strings
+        *args: The arguments, either scalars or arrays as long as x
+        otype: The type of the result
+
+    Returns:
+        The result of fun for all the elements, in the original order
+    """
+    vec_args = [arg for arg in args if isinstance(arg, pa.Array)]
+    if not vec_args:
+        return fun(x, *args)
+
+    # Encode the combination of the arguments as an integer key
+    key = np.zeros(len(x), dtype=np.int64)
+    valid = np.ones(len(x), dtype=bool)
+    for arg in vec_args:
+        encoded = arg.dictionary_encode()
+        codes = encoded.indices.fill_null(0).to_numpy(zero_copy_only=False)
+        key = key * max(len(encoded.dictionary), 1) + codes
+        valid &= encoded.indices.is_valid().to_numpy(zero_copy_only=False)
+
+    rows = np.flatnonzero(valid)
+    order = rows[np.argsort(key[rows], kind="stable")]
+    starts = np.flatnonzero(np.diff(key[order], prepend=-1)) if len(order) else order
+    ends = np.append(starts[1:], len(order))
+    # The elements and the arguments in the order of the groups, so that
+    # each group is a zero-copy slice of them
+    sorted_x = x.take(pa.array(order))
+    columns = [
+        arg.take(pa.array(order[starts])).to_pylist()
+        if isinstance(arg, pa.Array)
+        else [arg] * len(starts)
+        for arg in args
+    ]
+    chunks = [pa.array([], type=otype)]
+    for start, end, *scalars in zip(starts, ends, *columns):
+        chunks.append(fun(sorted_x.slice(start, end - start), *scalars))
+
+    # Where each element of x is in the concatenated results
+    positions = np.zeros(len(x), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    return pa.concat_arrays(chunks).take(pa.array(positions, mask=~valid))
+
+
+def _combine_patterns(patterns, fixed: bool) -> str:
+    """Combine a set of patterns into one regex matching any of them"""
+    if fixed:
+        return "|".join(_escape_regex(pattern) for pattern in patterns)
+    return "|".join(f"(?:{pattern})" for pattern in patterns)
+
+
+# Characters that make a pattern not a literal string
+_REGEX_METACHARS = frozenset(".^$*+?()[]{}|\\")
+# Kernels to match a literal string, by the kind of the pattern
+_LITERAL_MATCHERS = {
+    "literal": pc.match_substring,
+    "prefix": pc.starts_with,
+    "suffix": pc.ends_with,
+}
+
+
+@lru_cache(maxsize=1024)
+def _analyze_pattern(pattern: str) -> tuple[str, str | None]:
+    """Find out if a regular expression is actually a literal string,
+    optionally anchored at the start and/or the end, so that the cheaper
+    literal kernels can be used, without compiling the regex.
+
+    Args:
+        pattern: The regular expression
+
+    Returns:
+        The kind of the pattern, one of "literal", "prefix" (`^lit`),
+        "suffix" (`lit$`), "exact" (`^lit$`) and "regex", and the literal
+        string (None for "regex")
+    """
+    anchor_start = pattern.startswith("^")
+    anchor_end = False
+    chars = []
+    i = int(anchor_start)
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            # Only escaped punctuations are literal, \d, \1, etc are not
+            if i + 1 == len(pattern) or pattern[i + 1] not in string.punctuation:
+                return "regex", None
+            chars.append(pattern[i + 1])
+            i += 2
+            continue
+
+        if char == "$" and i == len(pattern) - 1:
+            anchor_end = True
+        elif char in _REGEX_METACHARS:
+            return "regex", None
+        else:
+            chars.append(char)
+        i += 1
+
+    if anchor_start:
+        kind = "exact" if anchor_end else "prefix"
+    else:
+        kind = "suffix" if anchor_end else "literal"
+    return kind, "".join(chars)
+
+
+def _escape_regex(literal: str) -> str:
+    """Escape a literal string to be used in a regular expression
+
+    Unlike `re.escape()`, only punctuations are escaped, since RE2 does
+    not allow escaping whitespaces.
+    """
+    return "".join(
+        f"\\{char}" if char in string.punctuation else char for char in literal
+    )
+
+
+@lru_cache(maxsize=1024)
+def _match_options(
+    pattern: str,
+    ignore_case: bool,
+) -> pc.MatchSubstringOptions:
+    """Get the (cached) options for the matching kernels"""
+    return pc.MatchSubstringOptions(pattern, ignore_case=ignore_case)
+
+
+@lru_cache(maxsize=1024)
+def _replace_options(
+    pattern: str,
+    replacement: str,
+    count: int | None,
+) -> pc.ReplaceSubstringOptions:
+    """Get the (cached) options for the replacing kernels"""
+    return pc.ReplaceSubstringOptions(
+        pattern,
+        replacement,
+        max_replacements=count,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _split_options(pattern: str) -> pc.SplitPatternOptions:
+    """Get the (cached) options for the splitting kernels"""
+    return pc.SplitPatternOptions(pattern)
+
+
 def _match(
     text: DatarArray,
-    pattern: str,
+    pattern: str | set | pa.Array,
     ignore_case: bool,
     invert: bool,
     fixed: bool,
 ) -> pa.BooleanArray:
-    """Do the regex match"""
-    if fixed:
-        out = pc.match_substring(
-            text.storage,
+    """Do the regex match
+
+    Patterns that are literal strings (optionally anchored) are matched
+    without regex. A set of patterns is matched by one combined regex, and
+    an array of patterns is matched element-wise.
+    """
+    if isinstance(text, DatarArray):
+        text = text.storage
+
+    if isinstance(pattern, pa.Array):
+        return _apply_by_pattern(
+            lambda txt, pat: _match(txt, pat, ignore_case, invert, fixed),
+            text,
             pattern,
-            ignore_case=ignore_case,
+            otype=pa.bool_(),
+        )
+
+    if isinstance(pattern, (set, frozenset)):
+        pattern, fixed = _combine_patterns(pattern, fixed), False
+
+    kind, literal = ("literal", pattern) if fixed else _analyze_pattern(pattern)
+    if kind == "exact" and not ignore_case:
+        out = pc.equal(text, literal)
+    elif kind in _LITERAL_MATCHERS:
+        out = _LITERAL_MATCHERS[kind](
+            text,
+            options=_match_options(literal, ignore_case),
         )
     else:
         out = pc.match_substring_regex(
-            text.storage,
-            pattern,
-            ignore_case=ignore_case,
+            text,
+            options=_match_options(pattern, ignore_case),
         )
 
     return pc.invert(out) if invert else out
 
 
+def _matches(
+    pattern: Any,
+    x: Any,
+    ignore_case: bool,
+    fixed: bool,
+    invert: bool,
+    fun: str,
+) -> pa.BooleanArray:
+    """Match the pattern(s) against the elements of x, on the levels only
+    for a factor unless there is a pattern for each element"""
+    return _on_levels(
+        lambda text, pat: _match(text, pat, ignore_case, invert, fixed),
+        x,
+        _vectorize_pattern(pattern, _size(x), fun),
+    )
+
+
 def _sub_(
-    pattern: str,
-    replacement: str,
+    pattern: str | set | list,
+    replacement: str | list,
     x: DatarArray,
     ignore_case: bool = False,
     fixed: bool = False,
@@ -92,25 +351,63 @@ def _sub_(
     """Replace a pattern with replacement for elements in x,
     with argument count available
     """
+    size = _size(x)
+    return _on_levels(
+        lambda txt, pat, rep: _apply_by_pattern(
+            lambda txt, pat, rep: _replace(txt, pat, rep, ignore_case, fixed, count),
+            txt,
+            pat,
+            rep,
+            otype=pa.string(),
+        ),
+        x,
+        _vectorize_pattern(pattern, size, fun),
+        _vectorize_pattern(replacement, size, fun, "replacement"),
+    )
+
+
+def _replace(
+    x: pa.StringArray,
+    pattern: str | set,
+    replacement: str,
+    ignore_case: bool,
+    fixed: bool,
+    count: int | None,
+) -> pa.StringArray:
+    """Replace a single pattern or a set of patterns with replacement"""
+    if isinstance(pattern, (set, frozenset)):
+        pattern = _combine_patterns(pattern, fixed)
+        if fixed:
+            replacement = replacement.replace("\\", "\\\\")
+        fixed = False
+
     if ignore_case:
-        raise NotImplementedError("ignore_case is not supported yet")
+        # There is no case-insensitive literal replacement kernel, so let
+        # RE2 do it with the (?i) flag
+        if fixed:
+            pattern = _escape_regex(pattern)
+            replacement = replacement.replace("\\", "\\\\")
+        return pc.replace_substring_regex(
+            x,
+            options=_replace_options(f"(?i){pattern}", replacement, count),
+        )
+
+    if not fixed and "\\" not in replacement:
+        # A literal pattern can be replaced without regex, as long as the
+        # replacement has no backreferences
+        kind, literal = _analyze_pattern(pattern)
+        if kind == "literal":
+            pattern, fixed = literal, True
 
-    pattern = _warn_more_pat_or_rep(pattern, fun)
-    replacement = _warn_more_pat_or_rep(replacement, fun, "replacement")
-    x = make_array(x, dtype="str")
     if fixed:
         return pc.replace_substring(
-            x.storage,
-            pattern,
-            replacement,
-            max_replacements=count,
+            x,
+            options=_replace_options(pattern, replacement, count),
         )
 
     return pc.replace_substring_regex(
-        x.storage,
-        pattern,
-        replacement,
-        max_replacements=count,
+        x,
+        options=_replace_options(pattern, replacement, count),
     )
 
 
@@ -167,18 +464,18 @@ def _grep(
     fixed=False,
     invert=False,
 ):
-    pattern = _warn_more_pat_or_rep(pattern, "grepl")
     x_scalar = is_scalar(x)
-    x = make_array(x, dtype=str)
-    matched = _match(
-        x,
-        pattern,
-        ignore_case=ignore_case,
-        invert=invert,
-        fixed=fixed,
-    )
-    matched = np.flatnonzero(matched)
-    out = x.take(matched) if value else make_array(matched)
+    matched = _matches(pattern, x, ignore_case, fixed, invert, "grep")
+    matched = np.flatnonzero(matched.fill_null(False))
+    if not value:
+        out = make_array(matched)
+    else:
+        # only the matched elements of a factor are decoded
+        dictarr = _dictionary_of(x)
+        if dictarr is not None:
+            out = make_array(dictarr.take(matched), dtype=str)
+        else:
+            out = make_array(x, dtype=str).take(matched)
     return out[0] if x_scalar and len(out) > 0 else out
 
 
@@ -191,14 +488,7 @@ def _grepl(
     fixed=False,
     invert=False,
 ):
-    pattern = _warn_more_pat_or_rep(pattern, "grepl")
-    out = _match(
-        make_array(x, dtype=str),
-        pattern,
-        ignore_case=ignore_case,
-        invert=invert,
-        fixed=fixed,
-    )
+    out = _matches(pattern, x, ignore_case, fixed, invert, "grepl")
     return out[0] if is_scalar(x) else out
 
 
@@ -231,28 +521,49 @@ def _gsub(
 @strsplit.register(object, backend="arrow")
 @wrap_arrow_result
 def _strsplit(x, split, fixed=False) -> pa.ListArray:
-    x = make_array(x, dtype=str)
-    if fixed:
-        out = pc.split_pattern(x.storage, split)
-    else:
-        out = pc.split_pattern_regex(x.storage, split)
+    if not fixed:
+        kind, literal = _analyze_pattern(split)
+        if kind == "literal":
+            split, fixed = literal, True
 
-    return out
+    kernel = pc.split_pattern if fixed else pc.split_pattern_regex
+    return _on_levels(
+        lambda text: kernel(text, options=_split_options(split)),
+        x,
+    )
 
 
 @paste.register(object, backend="arrow")
 @wrap_arrow_result
 def _paste(*args, sep=" ", collapse=None):
-    arrs = broadcast_arrays(*args)
-    out = pc.binary_join_element_wise(
-        *(a.storage.cast("str") for a in arrs),
-        sep,
-        null_handling="skip",
-    )
+    arrs = [make_array(arg).storage.cast("str") for arg in args]
+    maxlen = max((len(arr) for arr in arrs), default=0)
+    if any(len(arr) not in (1, maxlen) for arr in arrs):
+        raise ValueError("Arrays must be of length 1 or the max length")
+
+    if not arrs:
+        # Nothing to paste, as R's character(0)
+        out = pa.array([], type=pa.string())
+    else:
+        # Pass length-1 arguments as scalars, which the kernel broadcasts
+        # without materializing them
+        out = pc.binary_join_element_wise(
+            *(arr[0] if len(arr) < maxlen else arr for arr in arrs),
+            sep,
+            null_handling="skip",
+        )
     if collapse is None:
         return out
 
-    return collapse.join(make_array(out))
+    # Join all the strings into a single buffer with one list kernel
+    if out.nbytes + len(collapse) * len(out) < 2**31:
+        whole = pa.ListArray.from_arrays([0, len(out)], out)
+    else:  # pragma: no cover
+        whole = pa.LargeListArray.from_arrays(
+            [0, len(out)],
+            out.cast(pa.large_string()),
+        )
+    return pc.binary_join(whole, collapse)[0]
 
 
 @paste0.register(object, backend="arrow")
@@ -273,79 +584,417 @@ def _sprintf(fmt, *args):
 @substr.register(object, backend="arrow")
 @wrap_arrow_result
 def _substr(x, start, stop):
-    return pc.utf8_slice_codeunits(x, start, stop)
+    return _slice_on_levels(x, start, stop)
 
 
 @substring.register(object, backend="arrow")
 @wrap_arrow_result
-def _substring(x, first, last=1000000):
-    return pc.utf8_slice_codeunits(x, first, last)
+def _substring(x, first, last=None):
+    return _slice_on_levels(x, first, last)
+
+
+def _slice_on_levels(x: Any, start: Any, stop: Any) -> pa.Array:
+    """Slice the strings, on the levels only for a factor with scalar
+    positions"""
+    if is_scalar(x) or not is_scalar(start) or not is_scalar(stop):
+        return _slice_strings(x, start, stop)
+    return _on_levels(lambda text: _slice_strings(text, start, stop), x)
+
+
+def _slice_positions(
+    pos: Any,
+    size: int,
+    default: int,
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Recycle the start or stop positions to size
+
+    Returns:
+        The positions and the mask of the NAs (None if no NAs)
+    """
+    if pos is None:
+        return np.full(size, default, dtype=np.int64), None
+
+    pos = make_array(pos).storage
+    if len(pos) == 1:
+        pos = pa.repeat(pos[0], size)
+    mask = None
+    if pos.null_count > 0:
+        mask = pc.is_null(pos).to_numpy(zero_copy_only=False)
+        pos = pos.fill_null(0)
+    return pos.cast("int64").to_numpy(zero_copy_only=False), mask
+
+
+def _slice_strings(x: Any, start: Any, stop: Any) -> pa.StringArray:
+    """Slice each string by code points, with python's slicing semantics
+
+    start and stop are 0-based, negative positions count from the end,
+    and None slices from the beginning or to the end. They can be vectors,
+    recycled along x, with NA giving NA.
+
+    The per-element slicing is done over the buffers: the byte offsets of
+    the slices are computed from the code point positions (which are the
+    byte positions themselves for ASCII data) and the bytes are gathered
+    in one take.
+    """
+    if is_scalar(start) and is_scalar(stop):
+        if stop is None:
+            return pc.utf8_slice_codeunits(x, start or 0)
+        return pc.utf8_slice_codeunits(x, start or 0, stop)
+
+    x = make_array(x, dtype=str).storage
+    lens = {len(x), 1 if is_scalar(start) else len(start)}
+    lens.add(1 if is_scalar(stop) else len(stop))
+    size = max(lens)
+    if len(lens - {1, size}) > 0:
+        raise ValueError("Arrays must be of length 1 or the max length")
+    if len(x) < size:
+        x = pa.repeat(x[0], size)
+
+    offsets = np.frombuffer(x.buffers()[1], dtype=np.int32)
+    offsets = offsets[x.offset : x.offset + size + 1]
+    data = x.buffers()[2]
+    if data is None:
+        data = np.empty(0, dtype=np.uint8)
+    else:
+        data = np.frombuffer(data, dtype=np.uint8)[offsets[0] : offsets[-1]]
+    offsets = offsets - offsets[0]
+
+    if data.size > 0 and data.max() >= 0x80:
+        # byte positions of the code points, bytes 0b10xxxxxx continue one
+        char_bytes = np.flatnonzero((data & 0xC0) != 0x80)
+        char_offsets = np.searchsorted(char_bytes, offsets)
+        char_bytes = np.append(char_bytes, data.size)
+    else:
+        char_bytes = None
+        char_offsets = offsets
+
+    nchars = np.diff(char_offsets)
+    starts, start_na = _slice_positions(start, size, 0)
+    stops, stop_na = _slice_positions(stop, size, np.iinfo(np.int32).max)
+    starts = np.clip(np.where(starts < 0, starts + nchars, starts), 0, nchars)
+    stops = np.clip(np.where(stops < 0, stops + nchars, stops), starts, nchars)
+    starts = starts + char_offsets[:-1]
+    stops = stops + char_offsets[:-1]
+    if char_bytes is not None:
+        starts = char_bytes[starts]
+        stops = char_bytes[stops]
+
+    out_lens = stops - starts
+    out_offsets = np.zeros(size + 1, dtype=np.int32)
+    np.cumsum(out_lens, out=out_offsets[1:])
+    index = np.repeat(starts - out_offsets[:-1], out_lens)
+    index += np.arange(out_offsets[-1])
+
+    mask = pc.is_null(x).to_numpy(zero_copy_only=False)
+    for na in (start_na, stop_na):
+        if na is not None:
+            mask |= na
+    null_count = int(mask.sum())
+    validity = pa.array(~mask).buffers()[1] if null_count > 0 else None
+    return pa.Array.from_buffers(
+        pa.string(),
+        size,
+        [validity, pa.py_buffer(out_offsets), pa.py_buffer(data[index])],
+        null_count=null_count,
+    )
 
 
 @startswith.register(object, backend="arrow")
 @wrap_arrow_result
 def _startswith(x, prefix):
-    return pc.starts_with(x, prefix)
+    out = _on_levels(lambda text: pc.starts_with(text, prefix), x)
+    return out[0] if is_scalar(x) else out
 
 
 @endswith.register(object, backend="arrow")
 @wrap_arrow_result
 def _endswith(x, suffix):
-    return pc.ends_with(x, suffix)
+    out = _on_levels(lambda text: pc.ends_with(text, suffix), x)
+    return out[0] if is_scalar(x) else out
+
+
+# Whitespaces skipped by C's strtol()
+_STRTOL_SPACES = r"[ \t\n\v\f\r]*"
+# The strings in the plain forms parsed by the cast kernel directly, by the
+# base: decimal numbers of at most 18 digits and hexadecimal ones of at most
+# 16 digits, which always fit in 64 bits
+_CAST_PATTERNS = {
+    0: r"^(-?[1-9][0-9]{0,17}|0|0[xX][0-9a-fA-F]{1,16})$",
+    10: r"^-?[0-9]{1,18}$",
+    16: r"^(0[xX])?[0-9a-fA-F]{1,16}$",
+}
+
+
+@lru_cache(maxsize=64)
+def _strtol_pattern(base: int) -> str:
+    """The regex of the strings that C's strtol() parses to the end"""
+    if base == 0:
+        number = "0[xX][0-9a-fA-F]+|0[0-7]*|[1-9][0-9]*"
+    elif base <= 10:
+        number = f"[0-{base - 1}]+"
+    else:
+        last = string.ascii_lowercase[base - 11]
+        number = f"[0-9a-{last}A-{last.upper()}]+"
+        if base == 16:
+            number = f"(?:0[xX])?{number}"
+    return f"^{_STRTOL_SPACES}[+-]?(?:{number})$"
+
+
+def _strtoi_strings(x: pa.StringArray, base: int) -> pa.Int64Array:
+    """Parse strings into integers like C's strtol(), but NA if not all
+    the characters are consumed
+
+    Decimal and hexadecimal numbers in their plain forms (see
+    `_CAST_PATTERNS`) are parsed by the cast kernel. The other valid ones,
+    with leading whitespaces, a `+` sign, octal or other bases, etc, are
+    parsed by python's int().
+
+    Args:
+        x: The strings
+        base: The base, 2 to 36, or 0 to detect it from the prefix (`0x`
+            or `0X` for hexadecimal, `0` for octal)
+
+    Returns:
+        The integers, NA for invalid strings and values out of int64
+    """
+    others = pc.match_substring_regex(x, _strtol_pattern(base))
+    if base in _CAST_PATTERNS:
+        plain = pc.match_substring_regex(x, _CAST_PATTERNS[base])
+        text = pc.if_else(plain, x, "0")
+        hex_ = pc.starts_with(text, "0x", ignore_case=True)
+        if base == 16:
+            text = pc.if_else(hex_, text, pc.utf8_replace_slice(text, 0, 0, "0x"))
+            hex_ = plain
+        out = pc.cast(text, pa.int64())
+        # hexadecimal numbers from 2^63 wrap around, and invalid strings
+        # are parsed from "0"
+        out = pc.if_else(
+            pc.or_(pc.and_(hex_, pc.less(out, 0)), pc.invert(others)),
+            pa.scalar(None, pa.int64()),
+            out,
+        )
+        others = pc.and_not(others, plain)
+    else:
+        out = pa.nulls(len(x), pa.int64())
+
+    others = others.fill_null(False)
+    if not pc.any(others).as_py():
+        return out
+
+    texts = x.filter(others)
+    bases = [base] * len(texts)
+    if base == 0:
+        prefix = f"^{_STRTOL_SPACES}[+-]?0"
+        hex_ = pc.match_substring_regex(texts, prefix + "[xX]")
+        octal = pc.match_substring_regex(texts, prefix)
+        bases = pc.if_else(hex_, 16, pc.if_else(octal, 8, 10)).to_pylist()
+    parsed = [
+        value if -(2**63) < value < 2**63 else None
+        for value in map(int, texts.to_pylist(), bases)
+    ]
+    return pc.replace_with_mask(out, others, pa.array(parsed, type=pa.int64()))
 
 
 @strtoi.register(object, backend="arrow")
 @wrap_arrow_result
 def _strtoi(x, base=0):
-    if base not in (0, 10):
-        raise ValueError("`base` other than 0 or 10 not supported")
-    x_scalar = is_scalar(x)
-    x = make_array(x, dtype=str)
-    x = pa.array(
-        list(x),
-        type="string",
-        mask=pc.invert(pc.utf8_is_digit(x.storage)),
-    )
-    out = x.cast("int64")
-    return out[0] if x_scalar else out
+    if base != 0 and not 2 <= base <= 36:
+        raise ValueError("`base` must be 0 or between 2 and 36")
+
+    out = _on_levels(lambda text: _strtoi_strings(text, base), x)
+    return out[0] if is_scalar(x) else out
 
 
 @trimws.register(object, backend="arrow")
 @wrap_arrow_result
 def _trimws(x, which="both", whitespace=r" \t"):
     if which == "both":
-        return pc.utf8_trim(x, whitespace)
-    if which == "left":
-        return pc.utf8_ltrim(x, whitespace)
-    if which == "right":
-        return pc.utf8_rtrim(x, whitespace)
-    raise ValueError("`which` must be one of 'both', 'left', 'right'")
+        kernel = pc.utf8_trim
+    elif which == "left":
+        kernel = pc.utf8_ltrim
+    elif which == "right":
+        kernel = pc.utf8_rtrim
+    else:
+        raise ValueError("`which` must be one of 'both', 'left', 'right'")
+
+    out = _on_levels(lambda text: kernel(text, whitespace), x)
+    return out[0] if is_scalar(x) else out
 
 
 @toupper.register(object, backend="arrow")
 @wrap_arrow_result
 def _toupper(x):
-    return pc.utf8_upper(x)
+    out = _on_levels(pc.utf8_upper, x)
+    return out[0] if is_scalar(x) else out
 
 
 @tolower.register(object, backend="arrow")
 @wrap_arrow_result
 def _tolower(x):
-    return pc.utf8_lower(x)
+    out = _on_levels(pc.utf8_lower, x)
+    return out[0] if is_scalar(x) else out
 
 
 @chartr.register(object, backend="arrow")
 @wrap_arrow_result
 def _chartr(old, new, x):
-    x_scalar = is_scalar(x)
-    x = make_array(x, dtype=str)
     old = _warn_more_pat_or_rep(old, "chartr", "old")
     new = _warn_more_pat_or_rep(new, "chartr", "new")
 
-    new = new[: len(old)]
-    for oldc, newc in zip(old, new):
-        x = pc.replace_substring(x.storage, oldc, newc)
-    return x[0] if x_scalar else x
+    table = dict(zip(old, new))
+    out = _on_levels(lambda text: _translate(text, table), x)
+    return out[0] if is_scalar(x) else out
+
+
+# Up to this number of pairs, non-ASCII characters are translated by one
+# replacing kernel call for each
+_MAX_REPLACE_PAIRS = 4
+
+
+def _unchained_pairs(table: dict) -> list[tuple[str, str]] | None:
+    """Order the pairs of a translation table, so that replacing them one
+    after another never translates a character twice
+
+    Returns:
+        The ordered pairs, or None if there is a cycle, such as a -> b
+        and b -> a
+    """
+    pending = dict(table)
+    pairs = []
+    while pending:
+        ready = [old for old, new in pending.items() if new not in pending]
+        if not ready:
+            return None
+        pairs.extend((old, pending.pop(old)) for old in ready)
+    return pairs
+
+
+def _translate(x: pa.StringArray, table: dict) -> pa.StringArray:
+    """Translate the characters of all strings at once, never
+    translating a character twice
+
+    Args:
+        x: The strings
+        table: The mapping from old characters to new characters
+
+    Returns:
+        The translated strings
+    """
+    table = {old: new for old, new in table.items() if old != new}
+    if not table or x.null_count == len(x):
+        return x
+
+    if not all(char.isascii() for char in (*table, *table.values())):
+        pairs = _unchained_pairs(table)
+        if pairs is None or len(pairs) > _MAX_REPLACE_PAIRS:
+            return _translate_utf8(x, table)
+        # The replacing kernel is faster for a few pairs
+        for old, new in pairs:
+            x = pc.replace_substring(x, old, new)
+        return x
+
+    # ASCII bytes never occur inside a multi-byte UTF-8 sequence, so the
+    # data buffer can be mapped byte by byte, keeping the offsets
+    lookup = np.arange(256, dtype=np.uint8)
+    for old, new in table.items():
+        lookup[ord(old)] = ord(new)
+    validity, offsets, data = x.buffers()
+    if data is not None:
+        data = pa.py_buffer(lookup[np.frombuffer(data, dtype=np.uint8)])
+    return pa.Array.from_buffers(
+        x.type,
+        len(x),
+        [validity, offsets, data],
+        null_count=x.null_count,
+        offset=x.offset,
+    )
+
+
+def _translate_utf8(x: pa.StringArray, table: dict) -> pa.StringArray:
+    """Translate any characters on the UTF-8 data buffer
+
+    A lead byte never occurs inside another character, so the characters
+    to translate are found by their encoded bytes. A character may take a
+    different number of bytes after the translation, so bytes are dropped
+    or inserted, and the offsets are shifted accordingly.
+    """
+    otype = np.int64 if pa.types.is_large_string(x.type) else np.int32
+    validity, offsets, data = x.buffers()
+    if data is None:
+        return x
+
+    offsets = np.frombuffer(offsets, dtype=otype)[x.offset : x.offset + len(x) + 1]
+    data = np.frombuffer(data, dtype=np.uint8)[offsets[0] : offsets[-1]]
+    offsets = offsets - offsets[0]
+
+    olds = [old.encode() for old in table]
+    news = [new.encode() for new in table.values()]
+    new_bytes = np.zeros((len(news), 4), dtype=np.uint8)
+    for i, new in enumerate(news):
+        new_bytes[i, : len(new)] = list(new)
+    new_sizes = np.array([len(new) for new in news], dtype=np.int64)
+    old_sizes = np.array([len(old) for old in olds], dtype=np.int64)
+
+    # Only scan the positions starting with the lead byte of any character
+    is_lead = np.zeros(256, dtype=bool)
+    is_lead[[old[0] for old in olds]] = True
+    candidates = np.flatnonzero(is_lead[data])
+    positions = []
+    entries = []
+    for i, old in enumerate(olds):
+        pos = candidates[data[candidates] == old[0]]
+        for k in range(1, len(old)):
+            pos = pos[data[pos + k] == old[k]]
+        positions.append(pos)
+        entries.append(np.full(len(pos), i))
+
+    positions = np.concatenate(positions)
+    entries = np.concatenate(entries)
+    old_size = old_sizes[entries]
+    new_size = new_sizes[entries]
+
+    # Overwrite the bytes both characters have, then drop the extra old
+    # bytes and insert the extra new ones after each character
+    out = data.copy()
+    removed = np.zeros(len(data) + 1, dtype=bool)
+    inserts = []
+    inserted = []
+    for k in range(max(old_sizes.max(), new_sizes.max())):
+        both = (old_size > k) & (new_size > k)
+        out[positions[both] + k] = new_bytes[entries[both], k]
+        removed[positions[(old_size > k) & ~both] + k] = True
+        extra = (new_size > k) & ~both
+        inserts.append(positions[extra] + old_size[extra])
+        inserted.append(new_bytes[entries[extra], k])
+
+    if (old_size > new_size).any():
+        out = out[~removed[:-1]]
+        # The number of bytes dropped before each position
+        dropped = np.cumsum(removed, dtype=otype)
+        offsets = offsets - dropped[offsets]
+    else:
+        dropped = None
+
+    inserts = np.concatenate(inserts)
+    if len(inserts) > 0:
+        # Stable, so that the extra bytes of a character keep their order
+        order = np.argsort(inserts, kind="stable")
+        inserts = inserts[order]
+        if dropped is not None:
+            inserts = inserts - dropped[inserts]
+        out = np.insert(out, inserts, np.concatenate(inserted)[order])
+        offsets = offsets + np.searchsorted(inserts, offsets, side="right")
+
+    # Pad the offsets so that the validity bitmap is kept for a slice
+    offsets = np.concatenate([np.zeros(x.offset, dtype=otype), offsets])
+    offsets = offsets.astype(otype, copy=False)
+    return pa.Array.from_buffers(
+        x.type,
+        len(x),
+        [validity, pa.py_buffer(offsets), pa.py_buffer(out)],
+        null_count=x.null_count,
+        offset=x.offset,
+    )
 
 
 @nchar.register(object, backend="arrow")
@@ -358,21 +1007,27 @@ def _nchar(
 ):
     x_scalar = is_scalar(x)
     x, keep_na = _prepare_nchar(x, type_, keep_na)
-    out = make_array(
-        _nchar_(
-            make_array(x),
-            retn=type_,
-            allow_na=allow_na,
-            keep_na=keep_na,
-            na_len=_na_len,
-        )
+    out = _on_levels(
+        lambda text: make_array(
+            _nchar_(
+                text.to_numpy(zero_copy_only=False),
+                retn=type_,
+                allow_na=allow_na,
+                keep_na=keep_na,
+                na_len=_na_len,
+            )
+        ).storage,
+        x,
     )
+    if not keep_na:
+        # NAs in the indices of a factor
+        out = out.fill_null(_na_len)
+    out = make_array(out)
     return out[0] if x_scalar else out
 
 
 @nzchar.register(object, backend="arrow")
 @wrap_arrow_result
 def _nzchar(x, keep_na: bool = False):
-    x = make_array(x, dtype=str)
-    x = pc.invert(pc.match_like(x.storage, ""))
-    return x if keep_na else x.fill_null(True)
+    out = _on_levels(lambda text: pc.invert(pc.match_like(text, "")), x)
+    return out if keep_na else out.fill_null(True)
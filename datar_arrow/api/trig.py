@@ -35,16 +35,7 @@ def _acos(x):
 def _acosh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # ln(x + sqrt(x^2 - 1))
-    return pc.ln(
-        pc.add(
-            x,
-            pc.multiply(
-                pc.sqrt(pc.subtract(x, 1)),
-                pc.sqrt(pc.add(x, 1)),
-            ),
-        )
-    )
+    return pc.acosh(x)
 
 
 @asin.register(object, backend="arrow")
@@ -60,13 +51,7 @@ def _asin(x):
 def _asinh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # ln(x + sqrt(x^2 + 1))
-    return pc.ln(
-        pc.add(
-            x,
-            pc.sqrt(pc.add(pc.multiply(x, x), 1)),
-        )
-    )
+    return pc.asinh(x)
 
 
 @atan.register(object, backend="arrow")
@@ -82,11 +67,7 @@ def _atan(x):
 def _atanh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # 0.5 * ln((1 + x) / (1 - x))
-    return pc.multiply(
-        0.5,
-        pc.ln(pc.divide(pc.add(1, x).cast("double"), pc.subtract(1, x))),
-    )
+    return pc.atanh(x)
 
 
 @cos.register(object, backend="arrow")
@@ -102,11 +83,7 @@ def _cos(x):
 def _cosh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # (e^x + e^-x) / 2
-    return pc.divide(
-        pc.add(pc.exp(x), pc.exp(pc.multiply(-1, x))),
-        2.0,
-    )
+    return pc.cosh(x)
 
 
 @cospi.register(object, backend="arrow")
@@ -130,11 +107,7 @@ def _sin(x):
 def _sinh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # (e^x - e^-x) / 2
-    return pc.divide(
-        pc.subtract(pc.exp(x), pc.exp(pc.multiply(-1, x))),
-        2.0,
-    )
+    return pc.sinh(x)
 
 
 @sinpi.register(object, backend="arrow")
@@ -158,11 +131,7 @@ def _tan(x):
 def _tanh(x):
     if isinstance(x, DatarArray):
         x = x.storage
-    # (e^x - e^-x) / (e^x + e^-x)
-    return pc.divide(
-        pc.subtract(pc.exp(x), pc.exp(pc.multiply(-1, x))).cast("double"),
-        pc.add(pc.exp(x), pc.exp(pc.multiply(-1, x))),
-    )
+    return pc.tanh(x)
 
 
 @tanpi.register(object, backend="arrow")
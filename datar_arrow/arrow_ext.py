@@ -1,18 +1,360 @@
 from __future__ import annotations
 from typing import Any, Callable
 
+import numpy as np
 import pyarrow as pa
 import pyarrow.compute as pc
+from datar.core.options import get_option
+from datar.core.utils import logger
+
+from .utils import (
+    wrap_arrow_result,
+    get_dtype,
+    is_scalar,
+    make_array,
+    wrap_arrow_value,
+)
+
+# How integer overflow in +, -, * and ** is handled (option `arrow_overflow`)
+# - "unchecked": wrap around silently (fastest)
+# - "checked": raise an error
+# - "na": turn the overflowed elements into NA with a warning, like R
+OVERFLOW_MODES = ("unchecked", "checked", "na")
+
+_COMPARISONS = (
+    pc.equal,
+    pc.not_equal,
+    pc.less,
+    pc.less_equal,
+    pc.greater,
+    pc.greater_equal,
+)
+# The comparisons on the positions of the levels for ordered factors, while
+# == and != still compare the values, like R
+_ORDER_COMPARISONS = _COMPARISONS[2:]
+
+
+def _operand_to_numpy(x: Any) -> tuple[Any, Any]:
+    """Get the values and the null mask of an operand for numpy
+
+    Nulls are filled with 0 so that integer arrays are not turned into
+    floats by the conversion. An array of the null type is all NA, with
+    integer zeros as its values.
+    """
+    if isinstance(x, pa.Scalar):
+        x = x.as_py()
+    if x is None:
+        return 0, True
+    if not isinstance(x, pa.Array):
+        return x, None
+    if pa.types.is_null(x.type):
+        return np.zeros(len(x), dtype=np.int64), np.ones(len(x), dtype=bool)
+    if x.null_count == 0:
+        return x.to_numpy(zero_copy_only=False), None
+    return (
+        x.fill_null(0).to_numpy(zero_copy_only=False),
+        x.is_null().to_numpy(zero_copy_only=False),
+    )
+
+
+def _overflow_mode() -> str:
+    """The validated option `arrow_overflow`"""
+    mode = get_option("arrow_overflow", "unchecked")
+    if mode not in OVERFLOW_MODES:
+        raise ValueError(
+            "Option `arrow_overflow` must be one of "
+            f"{', '.join(map(repr, OVERFLOW_MODES))}, got {mode!r}"
+        )
+    return mode
+
+
+def _fit_int_scalar(scalar: Any, values: Any) -> tuple[Any, bool]:
+    """Make the integer values work with a python integer operand
+
+    Returns:
+        The values, widened to int64 if the scalar does not fit their type
+        but fits int64, and whether the scalar is out of the range of
+        64-bit integers
+    """
+    if (
+        not isinstance(scalar, int)
+        or isinstance(scalar, bool)
+        or not isinstance(values, np.ndarray)
+        or not np.issubdtype(values.dtype, np.integer)
+    ):
+        return values, False
+
+    info = np.iinfo(values.dtype)
+    if info.min <= scalar <= info.max:
+        return values, False
+    int64 = np.iinfo(np.int64)
+    if int64.min <= scalar <= int64.max and values.dtype != np.uint64:
+        return values.astype(np.int64), False
+    return values, True
+
+
+def _divmod_op(ufunc: np.ufunc, x: Any, y: Any) -> pa.Array:
+    """Floor division or modulo with R's semantics
+
+    The result takes the sign of the divisor. Integers are computed exactly
+    in a single pass (no round trip through double) and a zero divisor
+    gives NA, while for doubles it gives Inf/-Inf for the division and
+    NaN for the modulo.
+
+    A python integer operand that is out of the range of 64-bit integers
+    is handled by the option `arrow_overflow`: "unchecked" computes in
+    double, "checked" raises an error and "na" gives NA with a warning.
+    """
+    xvals, xmask = _operand_to_numpy(x)
+    yvals, ymask = _operand_to_numpy(y)
+    xvals, y_out_of_range = _fit_int_scalar(yvals, xvals)
+    yvals, x_out_of_range = _fit_int_scalar(xvals, yvals)
+    if x_out_of_range or y_out_of_range:
+        scalar, values = (xvals, yvals) if x_out_of_range else (yvals, xvals)
+        mode = _overflow_mode()
+        if mode == "checked":
+            raise pa.ArrowInvalid(
+                f"Integer overflow: {scalar} is out of the range of {values.dtype}"
+            )
+        if mode == "na":
+            logger.warning("[datar_arrow] NAs produced by integer overflow")
+            return pa.nulls(values.size, type=pa.from_numpy_dtype(values.dtype))
+        xvals = np.asarray(xvals, dtype=np.float64)
+        yvals = np.asarray(yvals, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        out = np.asarray(ufunc(xvals, yvals))
+
+    mask = np.zeros(out.shape, dtype=bool)
+    for msk in (xmask, ymask):
+        if msk is not None:
+            mask |= msk
+
+    if np.issubdtype(out.dtype, np.integer):
+        mask |= np.equal(yvals, 0)
+        if ufunc is np.floor_divide and np.issubdtype(out.dtype, np.signedinteger):
+            # INT_MIN %/% -1 overflows
+            mask |= np.equal(xvals, np.iinfo(out.dtype).min) & np.equal(yvals, -1)
+
+    return pa.array(out.ravel(), mask=mask.ravel() if mask.any() else None)
+
+
+def _floor_divide(x: Any, y: Any) -> pa.Array:
+    return _divmod_op(np.floor_divide, x, y)
+
+
+def _mod(x: Any, y: Any) -> pa.Array:
+    return _divmod_op(np.mod, x, y)
+
+
+def _as_double(x: Any) -> Any:
+    """Cast an arrow array/scalar or a python number to double"""
+    if isinstance(x, (pa.Array, pa.Scalar)):
+        return pc.cast(x, pa.float64(), safe=False)
+    return float(x)
+
+
+def _overflowed_add(x: Any, y: Any, out: pa.Array) -> pa.BooleanArray:
+    """Which elements of the wrapped-around `out = x + y` overflowed"""
+    if pa.types.is_unsigned_integer(out.type):
+        return pc.less(out, x)
+    # the signs of x and y are the same but the sign of out is different
+    return pc.less(
+        pc.bit_wise_and(pc.bit_wise_xor(x, out), pc.bit_wise_xor(y, out)),
+        0,
+    )
+
+
+def _overflowed_subtract(x: Any, y: Any, out: pa.Array) -> pa.BooleanArray:
+    """Which elements of the wrapped-around `out = x - y` overflowed"""
+    if pa.types.is_unsigned_integer(out.type):
+        return pc.less(x, y)
+    # the signs of x and y are different and the sign of out is not x's
+    return pc.less(
+        pc.bit_wise_and(pc.bit_wise_xor(x, y), pc.bit_wise_xor(x, out)),
+        0,
+    )
+
+
+def _overflowed_multiply(x: Any, y: Any, out: pa.Array) -> pa.BooleanArray:
+    """Which elements of the wrapped-around `out = x * y` overflowed"""
+    x_is_zero = pc.equal(x, 0)
+    if pa.types.is_unsigned_integer(out.type):
+        return pc.and_(
+            pc.invert(x_is_zero),
+            pc.not_equal(pc.divide(out, pc.if_else(x_is_zero, 1, x)), y),
+        )
+
+    # out / x == y unless overflowed, with x == -1 (where the division
+    # itself could overflow) handled separately
+    x_is_neg1 = pc.equal(x, -1)
+    safe_x = pc.if_else(pc.or_(x_is_zero, x_is_neg1), 1, x)
+    int_min = -(1 << (out.type.bit_width - 1))
+    return pc.if_else(
+        x_is_neg1,
+        pc.equal(y, int_min),
+        pc.and_(
+            pc.invert(x_is_zero),
+            pc.not_equal(pc.divide(out, safe_x), y),
+        ),
+    )
+
+
+def _overflowed_power(x: Any, y: Any, out: pa.Array) -> pa.BooleanArray:
+    """Which elements of the wrapped-around `out = x ** y` overflowed
+
+    Decided by the magnitude of the double result, which is exact except
+    within double rounding error of the integer limits.
+    """
+    bits = out.type.bit_width
+    if not pa.types.is_unsigned_integer(out.type):
+        bits -= 1
+    return pc.greater_equal(
+        pc.abs(pc.power(_as_double(x), _as_double(y))),
+        float(1 << bits),
+    )
+
+
+_OVERFLOW_CHECKS = {
+    "add": _overflowed_add,
+    "subtract": _overflowed_subtract,
+    "multiply": _overflowed_multiply,
+    "power": _overflowed_power,
+}
+
+
+def _arith(op: str) -> Callable:
+    """Make an arithmetic function that handles integer overflow according
+    to the `arrow_overflow` option
 
-from .utils import wrap_arrow_result, get_dtype, wrap_arrow_value
+    Args:
+        op: The name of the unchecked compute function, which has a
+            `<op>_checked` counterpart
 
+    Returns:
+        The function taking the two operands
+    """
+    unchecked = getattr(pc, op)
+    checked = getattr(pc, f"{op}_checked")
+    overflowed = _OVERFLOW_CHECKS[op]
+
+    def fn(x: Any, y: Any) -> Any:
+        mode = _overflow_mode()
+        if mode == "unchecked":
+            return unchecked(x, y)
+        if mode == "checked":
+            return checked(x, y)
+
+        # Overflow is rare, so only locate it when the checked kernel fails
+        try:
+            return checked(x, y)
+        except pa.ArrowInvalid as exc:
+            if "overflow" not in str(exc):
+                raise
+
+        out = unchecked(x, y)
+        logger.warning("[datar_arrow] NAs produced by integer overflow")
+        return pc.if_else(
+            overflowed(x, y, out),
+            pa.scalar(None, out.type),
+            out,
+        )
+
+    fn.__name__ = fn.__qualname__ = f"_{op}"
+    return fn
 
-def _floor_divide(x: pa.Array, y: pa.Array):
-    return pc.floor(pc.divide(x, y)).cast("int64")
 
+_add = _arith("add")
+_subtract = _arith("subtract")
+_multiply = _arith("multiply")
+_power = _arith("power")
 
-def _mod(x: pa.Array, y: pa.Array):
-    return pc.subtract(x, pc.multiply(_floor_divide(x, y), y))
+
+def _reversed(x: pa.Array) -> pa.Array:
+    """The elements of x in reverse order
+
+    Fixed-width values without nulls are copied once from a reversed view
+    of their buffer, others are taken by a reversed index.
+    """
+    if len(x) < 2:
+        return x
+
+    width = x.type.bit_width if pa.types.is_primitive(x.type) else 0
+    if x.null_count > 0 or width < 8 or pa.types.is_dictionary(x.type):
+        return x.take(np.arange(len(x) - 1, -1, -1))
+
+    nbytes = width // 8
+    if nbytes in (1, 2, 4, 8):
+        dtype = np.dtype(f"u{nbytes}")
+    else:
+        dtype = np.dtype((np.void, nbytes))
+    values = np.frombuffer(x.buffers()[1], dtype=dtype)
+    values = values[x.offset : x.offset + len(x)][::-1]
+    return pa.Array.from_buffers(
+        x.type,
+        len(x),
+        [None, pa.py_buffer(np.ascontiguousarray(values))],
+    )
+
+
+def _rearrange(x: Any, fun: Callable[[pa.Array], pa.Array]) -> Any:
+    """Apply a positional function (slice, take, etc) to x
+
+    A factor stays a factor, with only its indices rearranged.
+    """
+    if not isinstance(x, DatarArray):
+        return fun(x)
+    if x.dictionary is None:
+        return fun(x.storage)
+    return DatarArray.create(fun(x._dictionary_array))
+
+
+def _combined(x: Any) -> Any:
+    """x as a single array if it is a chunked array
+
+    A single chunk is returned without being copied.
+    """
+    if not isinstance(x, pa.ChunkedArray):
+        return x
+    if x.num_chunks == 1:
+        return x.chunk(0)
+    return x.combine_chunks()
+
+
+def _ordered_dictionary(x: Any) -> pa.DictionaryArray | None:
+    """The dictionary array of x if x is an ordered factor"""
+    if isinstance(x, DatarArray):
+        x = x._dictionary_array if x.dictionary is not None else None
+    if isinstance(x, pa.DictionaryArray) and x.type.ordered:
+        return x
+    return None
+
+
+def _level_codes(x: Any, levels: pa.Array) -> Any:
+    """The positions of the values of x in the levels, NA for the values
+    that are not levels
+
+    The indices of a factor with the same levels are used directly.
+    """
+    encoded = x._dictionary_array if isinstance(x, DatarArray) else x
+    if isinstance(encoded, pa.DictionaryArray) and (
+        not isinstance(x, DatarArray) or x.dictionary is not None
+    ):
+        if not encoded.dictionary.equals(levels):
+            raise ValueError("Level sets of factors are different.")
+        return encoded.indices
+
+    if isinstance(x, DatarArray):
+        x = x.storage
+    elif is_scalar(x):
+        if not isinstance(x, pa.Scalar):
+            x = pa.scalar(x)
+    elif not isinstance(x, (pa.Array, pa.ChunkedArray)):
+        # i.e. a list of the levels
+        x = make_array(x).storage
+    if pa.types.is_null(x.type):
+        return pc.cast(x, pa.int32())
+    return pc.index_in(x, value_set=levels)
 
 
 def _binop(
@@ -22,6 +364,12 @@ def _binop(
     wrap: bool = True,
 ):
     """Binary operation"""
+    if fn in _ORDER_COMPARISONS:
+        ordered = _ordered_dictionary(x) or _ordered_dictionary(y)
+        if ordered is not None:
+            x = _level_codes(x, ordered.dictionary)
+            y = _level_codes(y, ordered.dictionary)
+
     if isinstance(x, DatarArray):
         x = x.storage
     if isinstance(y, DatarArray):
@@ -48,22 +396,22 @@ class DatarArray(pa.ExtensionArray):
     _dictionary_array = None
 
     def __add__(self, other):
-        return _binop(pc.add, self, other)
+        return _binop(_add, self, other)
 
     def __radd__(self, other):
-        return _binop(pc.add, other, self)
+        return _binop(_add, other, self)
 
     def __sub__(self, other):
-        return _binop(pc.subtract, self, other)
+        return _binop(_subtract, self, other)
 
     def __rsub__(self, other):
-        return _binop(pc.subtract, other, self)
+        return _binop(_subtract, other, self)
 
     def __mul__(self, other):
-        return _binop(pc.multiply, self, other)
+        return _binop(_multiply, self, other)
 
     def __rmul__(self, other):
-        return _binop(pc.multiply, other, self)
+        return _binop(_multiply, other, self)
 
     def __truediv__(self, other):
         return _binop(pc.divide, self, other)
@@ -72,10 +420,10 @@ class DatarArray(pa.ExtensionArray):
         return _binop(pc.divide, other, self)
 
     def __pow__(self, other):
-        return _binop(pc.power, self, other)
+        return _binop(_power, self, other)
 
     def __rpow__(self, other):
-        return _binop(pc.power, other, self)
+        return _binop(_power, other, self)
 
     def __eq__(self, other):
         return _binop(pc.equal, self, other)
@@ -0,0 +1,275 @@
+"""Lookup sets prepared once for repeated membership tests
+
+Arrow's set lookup kernels (`is_in`, `index_in`) build a hash table over
+the value set on every call. A `LookupSet` does the work that only
+depends on the values once, so testing many batches against the same
+reference values (allow-lists, dimension keys) does not repeat it:
+
+- the values are deduplicated, keeping the positions of their first
+  occurrences
+- dense integer and temporal values get a direct index from the values to
+  their positions, so batches of any size are looked up without hashing
+- other numbers are sorted, and strings get a python dict on their first
+  lookup, so that small batches are looked up without hashing the values
+  again
+
+`LookupSet` is accepted as `y` by `is_element()`, `intersect()`,
+`setdiff()` and `union()`, and as `table` by `match()`.
+
+`LookupSet.cached()` reuses the lookup sets by the content of the values,
+with the least recently used ones evicted when their total size exceeds
+the option `arrow_lookup_cache_size` (in bytes).
+"""
+from __future__ import annotations
+
+import hashlib
+import sys
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from datar.core.options import get_option
+
+from .utils import make_array
+
+__all__ = ["LookupSet"]
+
+# Binary search and dict lookups are used when the batch is this many
+# times smaller than the distinct values, otherwise hashing them again is
+# cheaper. Both cost about 4 times more per element than the hashing
+# kernels, which also hash the distinct values.
+SORTED_LOOKUP_RATIO = 4
+# Integer values get a direct index when the span of the values is at most
+# this many times the number of distinct values
+DENSE_INDEX_RATIO = 4
+
+
+def _fingerprint(x: pa.Array) -> str:
+    """Digest of the type and the content of an array"""
+    if x.get_total_buffer_size() > x.nbytes:
+        # Only the content of a slice, not the whole buffers it views
+        x = pa.concat_arrays([x])
+    buffers = x.buffers()
+    if x.null_count == 0:
+        # The same with or without a validity bitmap
+        buffers[0] = None
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{x.type}:{x.offset}:{len(x)}".encode())
+    for buf in buffers:
+        digest.update(b"-" if buf is None else memoryview(buf))
+    return digest.hexdigest()
+
+
+def _is_integer_like(type_: pa.DataType) -> bool:
+    """Whether the values of a type are compared as integers"""
+    return (
+        pa.types.is_integer(type_)
+        or pa.types.is_date(type_)
+        or pa.types.is_timestamp(type_)
+        or pa.types.is_duration(type_)
+    )
+
+
+def _int_keys(x: pa.Array) -> np.ndarray:
+    """The non-NA values of numbers, dates or times as int64 numbers,
+    equal when the values are equal
+
+    Floating numbers are compared by their bits, as the hashing kernels
+    do, with all NaNs the same.
+    """
+    values = x.to_numpy(zero_copy_only=False)
+    if values.dtype.kind == "f":
+        values = values.astype(np.float64)
+        values[np.isnan(values)] = np.nan
+        return values.view(np.int64)
+    if values.dtype.kind in "mM":
+        return values.view(np.int64)
+    return values.astype(np.int64, copy=False)
+
+
+class LookupSet:
+    """A set of values prepared for repeated lookups
+
+    Args:
+        values: The values, anything that `make_array()` accepts
+
+    Attributes:
+        values: The distinct values in the order of their first appearance
+        first: The positions of the first occurrences of the distinct
+            values, NA excluded, in the original values
+        has_na: Whether NA is one of the values
+    """
+
+    _cache: OrderedDict[str, LookupSet] = OrderedDict()
+    _cache_nbytes = 0
+
+    def __init__(self, values: Any):
+        values = make_array(values).storage
+        self.values = pc.unique(values)
+        self.has_na = self.values.null_count > 0
+        self._keys = self.values.drop_null() if self.has_na else self.values
+        self.first = pc.index_in(self._keys, value_set=values)
+        self._na_pos = (
+            pc.index(pc.is_null(values), True).as_py() if self.has_na else None
+        )
+        self._options = pc.SetLookupOptions(self._keys)
+
+        # The indexes of the distinct values, see _lookup()
+        self._dense = self._sorted = self._order = self._positions = None
+        if len(self._keys) == 0 or not (
+            _is_integer_like(self._keys.type)
+            or pa.types.is_floating(self._keys.type)
+        ):
+            return
+
+        keys = _int_keys(self._keys)
+        self._low = keys.min()
+        span = int(keys.max()) - int(self._low) + 1
+        if _is_integer_like(self._keys.type) and span <= DENSE_INDEX_RATIO * len(
+            keys
+        ):
+            self._dense = np.full(span, -1, dtype=np.int32)
+            self._dense[keys - self._low] = np.arange(len(keys))
+        else:
+            self._order = np.argsort(keys, kind="stable")
+            self._sorted = keys[self._order]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f"<LookupSet: {len(self)} distinct values of {self.values.type}>"
+
+    @property
+    def nbytes(self) -> int:
+        """The memory held by the lookup set, in bytes"""
+        nbytes = self.values.nbytes + self.first.nbytes
+        if self.has_na:
+            nbytes += self._keys.nbytes
+        if self._dense is not None:
+            nbytes += self._dense.nbytes
+        if self._sorted is not None:
+            nbytes += self._sorted.nbytes + self._order.nbytes
+        if self._positions is not None:
+            nbytes += sys.getsizeof(self._positions) + sum(
+                map(sys.getsizeof, self._positions)
+            )
+        return nbytes
+
+    @classmethod
+    def cached(cls, values: Any) -> LookupSet:
+        """Get the lookup set of the values from the cache, by their
+        content, building it if it is not there
+
+        Args:
+            values: The values
+
+        Returns:
+            The lookup set of the values
+        """
+        values = make_array(values).storage
+        key = _fingerprint(values)
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            return cls._cache[key]
+
+        out = cls(values)
+        limit = get_option("arrow_lookup_cache_size", 0)
+        if out.nbytes > limit:
+            return out
+
+        cls._cache[key] = out
+        # The indexes of strings are built on first use, so sizes may grow
+        cls._cache_nbytes = sum(cached.nbytes for cached in cls._cache.values())
+        while cls._cache_nbytes > limit:
+            _, evicted = cls._cache.popitem(last=False)
+            cls._cache_nbytes -= evicted.nbytes
+        return out
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Remove all the cached lookup sets"""
+        cls._cache.clear()
+        cls._cache_nbytes = 0
+
+    def _lookup(self, x: pa.Array) -> pa.Array:
+        """The positions of x in the distinct values without NA, NA for
+        no match and for NA"""
+        if x.type != self._keys.type or len(self._keys) == 0:
+            return pc.index_in(x, options=self._options)
+        if self._dense is not None:
+            return self._lookup_numbers(x, self._lookup_dense)
+        if len(x) * SORTED_LOOKUP_RATIO > len(self._keys):
+            return pc.index_in(x, options=self._options)
+        if self._sorted is not None:
+            return self._lookup_numbers(x, self._lookup_sorted)
+        if pa.types.is_string(x.type) or pa.types.is_large_string(x.type):
+            return self._lookup_strings(x)
+        return pc.index_in(x, options=self._options)
+
+    def _lookup_numbers(self, x: pa.Array, lookup) -> pa.Array:
+        """Look up numbers by their int64 keys, with NA not matching"""
+        mask = None
+        if x.null_count > 0:
+            mask = pc.is_null(x).to_numpy(zero_copy_only=False)
+            x = x.fill_null(self._keys[0])
+        pos, unmatched = lookup(_int_keys(x))
+        if mask is not None:
+            unmatched |= mask
+        return pa.array(pos, mask=unmatched)
+
+    def _lookup_dense(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The positions of the keys in the direct index"""
+        keys = keys - self._low
+        outside = (keys < 0) | (keys >= len(self._dense))
+        pos = self._dense[np.where(outside, 0, keys)]
+        return pos, outside | (pos < 0)
+
+    def _lookup_sorted(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The positions of the keys by binary search in the sorted ones"""
+        pos = np.searchsorted(self._sorted, keys)
+        pos = np.minimum(pos, len(self._sorted) - 1)
+        return self._order[pos], self._sorted[pos] != keys
+
+    def _lookup_strings(self, x: pa.Array) -> pa.Array:
+        """The positions of strings in the dict of the distinct values"""
+        if self._positions is None:
+            self._positions = {
+                value: i for i, value in enumerate(self._keys.to_pylist())
+            }
+        get = self._positions.get
+        return pa.array([get(value) for value in x.to_pylist()], type=pa.int64())
+
+    def contains(self, x: Any) -> pa.BooleanArray:
+        """Whether each element of x is one of the values
+
+        Args:
+            x: The values to look up
+
+        Returns:
+            The membership of each element of x, NA being a member if it
+            is one of the values
+        """
+        x = make_array(x).storage
+        out = pc.is_valid(self._lookup(x))
+        if self.has_na and x.null_count > 0:
+            out = pc.or_(out, pc.is_null(x))
+        return out
+
+    def index(self, x: Any) -> pa.Int64Array:
+        """The positions of the first occurrences of each element of x in
+        the values
+
+        Args:
+            x: The values to look up
+
+        Returns:
+            The 0-based positions, NA for no match
+        """
+        x = make_array(x).storage
+        out = self.first.take(self._lookup(x)).cast(pa.int64())
+        if self.has_na and x.null_count > 0:
+            out = pc.if_else(pc.is_null(x), self._na_pos, out)
+        return out
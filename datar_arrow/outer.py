@@ -0,0 +1,177 @@
+"""Outer products computed in blocks
+
+`outer()` of datar's base APIs materializes the whole result, a
+fixed-size list array with one row for each element of x. The
+`outer_blocks()` here yields the same rows block by block instead, so that
+results too large for the memory (i.e. 100K x 100K) can be streamed.
+
+Each block holds whole rows. "*" and the compute or numpy functions are
+element-wise, so the rows of a block come from one call on the elements of
+x repeated and the elements of y tiled. Custom functions are vectorized at
+the second argument only, as datar's `outer()` expects, and are called
+once for each element of x, with the whole of y. The number of elements
+in a block is limited by the option `arrow_outer_block_size`.
+"""
+from __future__ import annotations
+
+from itertools import chain
+from typing import Any, Callable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from datar.core.options import get_option
+
+from .arrow_ext import _multiply
+from .utils import make_array
+
+__all__ = ["outer_blocks"]
+
+
+def _elementwise_fun(fun: str) -> Callable:
+    """Get the element-wise function taking the (storage) arrays of x and y"""
+    if fun == "*":
+        return _multiply
+
+    return getattr(pc, fun, None) or getattr(np, fun)
+
+
+def _row_fun(fun: Callable) -> Callable:
+    """Get the function computing a row from an element of x and y"""
+    kwargs = {}
+    if getattr(fun, "_pipda_functype", None) in (
+        "pipeable",
+        "verb",
+    ):  # pragma: no cover
+        kwargs["__ast_fallback"] = "normal"
+
+    return lambda xi, y: make_array(fun(xi, y, **kwargs)).storage
+
+
+def _as_rows(flat: pa.Array, nrows: int, ncols: int) -> pa.FixedSizeListArray:
+    """Split the flat results into rows of ncols"""
+    if ncols > 0:
+        return pa.FixedSizeListArray.from_arrays(flat, ncols)
+    return pa.array([[]] * nrows, type=pa.list_(flat.type, 0))
+
+
+def outer_blocks(
+    x: Any,
+    y: Any,
+    fun: str | Callable = "*",
+    block_size: int | None = None,
+) -> Iterator[pa.FixedSizeListArray]:
+    """Compute the outer product of x and y block by block
+
+    Args:
+        x: The values for the rows
+        y: The values for the columns
+        fun: The function to compute the rows. "*" for multiplication, or
+            the name of a compute or numpy function, called element-wise.
+            Otherwise a function called with each element of x and the
+            whole of y.
+        block_size: The maximum number of elements in a block, defaults to
+            the option `arrow_outer_block_size`. A block always has at least
+            one row.
+
+    Yields:
+        The consecutive rows of the result, `fun(x[i], y[j])` at row i and
+        column j, as fixed-size list arrays
+    """
+    x = make_array(x)
+    y = make_array(y)
+    ncols = len(y)
+    if block_size is None:
+        block_size = get_option("arrow_outer_block_size", 1 << 22)
+    nrows = max(block_size // max(ncols, 1), 1)
+
+    if not isinstance(fun, str):
+        fun = _row_fun(fun)
+        if len(x) == 0:
+            # fun is never called, the type of the result is unknown
+            yield _as_rows(pa.array([], type=pa.null()), 0, ncols)
+            return
+
+        for start in range(0, len(x), nrows):
+            rows = [fun(xi, y) for xi in x[start : start + nrows]]
+            flat = rows[0] if len(rows) == 1 else pa.concat_arrays(rows)
+            if len(flat) != len(rows) * ncols:
+                raise ValueError(
+                    "`fun` must return a value for each element of `y`."
+                )
+            yield _as_rows(flat, len(rows), ncols)
+        return
+
+    fun = _elementwise_fun(fun)
+    x = x.storage
+    y = y.storage
+    if len(x) == 0:
+        # still call fun for the type of the result
+        yield _as_rows(make_array(fun(x, y.slice(0, 0))).storage, 0, ncols)
+        return
+
+    cols = np.arange(ncols)
+    for start in range(0, len(x), nrows):
+        block = x.slice(start, nrows)
+        size = len(block)
+        flat = fun(
+            block.take(np.repeat(np.arange(size), ncols)),
+            y.take(np.tile(cols, size)),
+        )
+        yield _as_rows(make_array(flat).storage, size, ncols)
+
+
+def _byte_width(type_: pa.DataType) -> int:
+    """The number of bytes of a value of a fixed-width type, 0 otherwise"""
+    try:
+        width = type_.bit_width
+    except ValueError:
+        return 0
+    return width // 8 if width % 8 == 0 else 0
+
+
+def _collect_blocks(
+    blocks: Iterator[pa.FixedSizeListArray],
+    nrows: int,
+    ncols: int,
+) -> pa.FixedSizeListArray:
+    """Collect the blocks of the rows into one fixed-size list array
+
+    The values of fixed-width types are written into a buffer allocated
+    for the whole result, without holding all blocks and concatenating
+    them, which would double the peak memory.
+    """
+    first = next(blocks)
+    if len(first) == nrows:
+        return first
+
+    type_ = first.type.value_type
+    width = _byte_width(type_)
+    if width == 0 or ncols == 0:
+        return pa.concat_arrays([first, *blocks])
+
+    data = np.empty(nrows * ncols * width, dtype=np.uint8)
+    valid = None
+    start = 0
+    for block in chain([first], blocks):
+        flat = block.flatten()
+        if flat.type != type_:
+            flat = flat.cast(type_)
+        size = len(flat)
+        offset = flat.offset * width
+        data[start * width : (start + size) * width] = np.frombuffer(
+            flat.buffers()[1], dtype=np.uint8
+        )[offset : offset + size * width]
+        if flat.null_count > 0:
+            if valid is None:
+                valid = np.ones(nrows * ncols, dtype=bool)
+            valid[start : start + size] = flat.is_valid().to_numpy(
+                zero_copy_only=False
+            )
+        start += size
+
+    bitmap = None
+    if valid is not None:
+        bitmap = pa.py_buffer(np.packbits(valid, bitorder="little"))
+    flat = pa.Array.from_buffers(type_, nrows * ncols, [bitmap, pa.py_buffer(data)])
+    return pa.FixedSizeListArray.from_arrays(flat, ncols)
@@ -8,6 +8,20 @@ from .utils import flatten_slice, make_array
 priority = -1
 
 
+@plugin.impl
+def setup():
+    from datar.core.options import add_option
+
+    # See datar_arrow.arrow_ext.OVERFLOW_MODES
+    add_option("arrow_overflow", "unchecked")
+    # The total size in bytes of the lookup sets cached by content,
+    # see datar_arrow.lookup.LookupSet.cached()
+    add_option("arrow_lookup_cache_size", 256 * 1024 * 1024)
+    # The maximum number of elements computed at a time by outer(),
+    # see datar_arrow.outer.outer_blocks()
+    add_option("arrow_outer_block_size", 1 << 22)
+
+
 @plugin.impl
 def base_api():
     from .api import (  # noqa: F401
@@ -0,0 +1,195 @@
+"""Positions and contents of regular expression matches
+
+`regexpr()`, `gregexpr()` and `regmatches()` work like their R
+counterparts: the first match or all the matches of a pattern in each
+string, and the matched substrings.
+
+The matches are found natively: every match is wrapped with a separator
+byte that does not occur in the data by RE2, and the strings are split
+by it, so that the pieces alternate between the non-matched and the
+matched parts. The positions then come from the lengths of the pieces.
+
+Like the other indexes in datar, the positions are 0-based, with -1 for
+no match. They count code points, not bytes.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .api.string import (
+    _escape_regex,
+    _replace_options,
+    _split_options,
+    _warn_more_pat_or_rep,
+)
+from .utils import make_array, wrap_arrow_result
+
+__all__ = ["regexpr", "gregexpr", "regmatches"]
+
+
+def _find_separator(x: pa.StringArray) -> str:
+    """Find a control character that does not occur in the strings"""
+    _, offsets, data = x.buffers()
+    if data is None:
+        return "\x00"
+
+    offsets = np.frombuffer(offsets, dtype=np.int32)
+    offsets = offsets[x.offset : x.offset + len(x) + 1]
+    data = np.frombuffer(data, dtype=np.uint8)[offsets[0] : offsets[-1]]
+    absent = np.flatnonzero(np.bincount(data, minlength=256)[:32] == 0)
+    if absent.size == 0:
+        raise ValueError(
+            "Cannot locate the matches of strings containing all the "
+            "ASCII control characters."
+        )
+    return chr(absent[0])
+
+
+def _split_matches(
+    x: Any,
+    pattern: str,
+    ignore_case: bool,
+    fixed: bool,
+    first: bool,
+) -> tuple[pa.StringArray, pa.ListArray]:
+    """Split the strings around the matches
+
+    Returns:
+        The strings and the lists of their pieces, alternating between the
+        non-matched and the matched parts, so the lists have odd lengths
+    """
+    x = make_array(x, dtype=str).storage
+    pattern = _warn_more_pat_or_rep(pattern, "regexpr")
+    if fixed:
+        pattern = _escape_regex(pattern)
+    pattern = f"(?:{pattern})"
+    if ignore_case:
+        pattern = f"(?i){pattern}"
+
+    sep = _find_separator(x)
+    wrapped = pc.replace_substring_regex(
+        x,
+        options=_replace_options(pattern, f"{sep}\\0{sep}", 1 if first else None),
+    )
+    return x, pc.split_pattern(wrapped, options=_split_options(sep))
+
+
+def _match_counts(pieces: pa.ListArray) -> tuple[np.ndarray, np.ndarray]:
+    """The list offsets of the pieces and the number of matches in them"""
+    offsets = pieces.offsets.to_numpy()
+    return offsets, np.maximum(np.diff(offsets) - 1, 0) // 2
+
+
+def _matched_index(offsets: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """The indexes of the matched pieces in the values of the lists"""
+    nth = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(offsets[:-1], counts) + nth * 2 + 1
+
+
+def _null_mask(x: pa.Array) -> pa.BooleanArray | None:
+    """The mask of the nulls of x, None if there is no null"""
+    return pc.is_null(x) if x.null_count > 0 else None
+
+
+@wrap_arrow_result
+def regexpr(
+    pattern: str,
+    text: Any,
+    ignore_case: bool = False,
+    fixed: bool = False,
+) -> pa.Int64Array:
+    """Find the position of the first match of a pattern in each string
+
+    Args:
+        pattern: The regular expression, or the literal string if `fixed`
+        text: The strings
+        ignore_case: Whether to ignore the case when matching
+        fixed: Whether the pattern is a literal string
+
+    Returns:
+        The 0-based positions of the first matches, -1 for no match
+    """
+    x, pieces = _split_matches(text, pattern, ignore_case, fixed, True)
+    offsets, counts = _match_counts(pieces)
+    lens = pc.utf8_length(pieces.values).to_numpy(zero_copy_only=False)
+    out = np.full(len(x), -1, dtype=np.int64)
+    matched = counts > 0
+    out[matched] = lens[offsets[:-1][matched]]
+    return pa.array(out, mask=pc.is_null(x).to_numpy(zero_copy_only=False))
+
+
+@wrap_arrow_result
+def gregexpr(
+    pattern: str,
+    text: Any,
+    ignore_case: bool = False,
+    fixed: bool = False,
+) -> pa.ListArray:
+    """Find the positions of all the matches of a pattern in each string
+
+    See `regexpr()` for the arguments.
+
+    Returns:
+        The lists of the 0-based positions of the matches, `[-1]` for
+        no match
+    """
+    x, pieces = _split_matches(text, pattern, ignore_case, fixed, False)
+    offsets, counts = _match_counts(pieces)
+    lens = pc.utf8_length(pieces.values).to_numpy(zero_copy_only=False)
+    # the positions of the pieces in their own strings
+    starts = np.concatenate([[0], np.cumsum(lens)])
+    starts = starts[:-1] - np.repeat(starts[offsets[:-1]], np.diff(offsets))
+
+    out_counts = np.maximum(counts, 1)
+    out_offsets = np.zeros(len(x) + 1, dtype=np.int32)
+    np.cumsum(out_counts, out=out_offsets[1:])
+    out = np.full(out_offsets[-1], -1, dtype=np.int64)
+    nth = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    out[np.repeat(out_offsets[:-1], counts) + nth] = starts[
+        _matched_index(offsets, counts)
+    ]
+    return pa.ListArray.from_arrays(out_offsets, out, mask=_null_mask(x))
+
+
+@wrap_arrow_result
+def regmatches(
+    text: Any,
+    pattern: str,
+    all: bool = False,
+    ignore_case: bool = False,
+    fixed: bool = False,
+) -> pa.StringArray | pa.ListArray:
+    """Extract the matches of a pattern from each string
+
+    Unlike R, which takes the match data from `regexpr()`/`gregexpr()`,
+    the pattern is given directly.
+
+    Args:
+        text: The strings
+        pattern: The regular expression, or the literal string if `fixed`
+        all: Whether to extract all the matches instead of the first one
+        ignore_case: Whether to ignore the case when matching
+        fixed: Whether the pattern is a literal string
+
+    Returns:
+        The first matches, NA for no match, or, if `all`, the lists of
+        all the matches
+    """
+    x, pieces = _split_matches(text, pattern, ignore_case, fixed, not all)
+    offsets, counts = _match_counts(pieces)
+    if all:
+        out_offsets = np.zeros(len(x) + 1, dtype=np.int32)
+        np.cumsum(counts, out=out_offsets[1:])
+        return pa.ListArray.from_arrays(
+            out_offsets,
+            pieces.values.take(_matched_index(offsets, counts)),
+            mask=_null_mask(x),
+        )
+
+    return pieces.values.take(
+        pa.array(offsets[:-1] + 1, mask=counts == 0)
+    )
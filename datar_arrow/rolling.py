@@ -0,0 +1,271 @@
+"""Rolling (moving window) aggregations
+
+`roll_sum()`, `roll_mean()`, `roll_min()`, `roll_max()` and `roll_sd()`
+compute a statistic over each window of `n` consecutive elements of `x`.
+
+Each window statistic costs O(n) regardless of the window size. Integer
+sums are differences of prefix sums, which are exact. The others use the
+van Herk/Gil-Werman block scan: the values are split into blocks of the
+window size and accumulated forwards and backwards within each block,
+and a window combines the backward accumulation at its start with the
+forward one at its end, which lie in adjacent blocks. Only the values of
+a window contribute to it, so a large value does not wipe out the
+precision of the later windows of floats. For standard deviations, the
+accumulations are shifted by a value of the window, and the two parts of
+a window are combined by Chan's formula.
+
+A window containing NA gives NA. The result has the same length as `x`,
+padded with NA where the window does not fit, according to `align`:
+
+- "right": the window ends at the current element (default)
+- "left": the window starts at the current element
+- "center": the current element is in the middle of the window
+"""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .utils import make_array, wrap_arrow_result
+
+__all__ = ["roll_sum", "roll_mean", "roll_min", "roll_max", "roll_sd"]
+
+ALIGNS = ("right", "left", "center")
+
+
+def _check_window(n: int, align: str) -> None:
+    """Validate the window size and alignment"""
+    if n < 1:
+        raise ValueError(f"Window size must be a positive integer, got {n}")
+    if align not in ALIGNS:
+        raise ValueError(
+            f"`align` must be one of {', '.join(map(repr, ALIGNS))}, "
+            f"got {align!r}"
+        )
+
+
+def _window_sums(x: pa.Array, n: int) -> pa.Array:
+    """Sums of all complete windows
+
+    The i-th element is the sum of x[i:i+n], so the result has
+    len(x) - n + 1 elements.
+    """
+    if not pa.types.is_floating(x.type):
+        # exact, even if the prefix sums wrap around
+        prefix = pa.concat_arrays(
+            [pa.array([0], type=x.type), pc.cumulative_sum(x)]
+        )
+        return pc.subtract(prefix.slice(n), prefix.slice(0, len(prefix) - n))
+
+    blocks = _blocks(x.to_numpy(zero_copy_only=False), n, 0)
+    forward = np.cumsum(blocks, axis=1)
+    # a window starting at a block is the backward accumulation alone
+    forward[:, -1] = 0
+    backward = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1]
+    return pa.array(_window_parts(backward, forward, len(x), n, np.add), type=x.type)
+
+
+def _blocks(values: np.ndarray, n: int, pad: Any) -> np.ndarray:
+    """Split the values into the rows of blocks of n, padding the last one"""
+    nblocks = -(-len(values) // n)
+    blocks = np.full(nblocks * n, pad, dtype=values.dtype)
+    blocks[: len(values)] = values
+    return blocks.reshape(nblocks, n)
+
+
+def _window_parts(
+    backward: np.ndarray,
+    forward: np.ndarray,
+    size: int,
+    n: int,
+    combine: Callable,
+) -> np.ndarray:
+    """Combine the backward accumulations at the window starts with the
+    forward ones at the window ends
+
+    The accumulations are in the blocks, i.e. the first two axes.
+    """
+    nwin = size - n + 1
+    backward = backward.reshape(-1, *backward.shape[2:])
+    forward = forward.reshape(-1, *forward.shape[2:])
+    return combine(backward[:nwin], forward[n - 1 : n - 1 + nwin])
+
+
+def _window_nulls(x: pa.Array, n: int) -> pa.BooleanArray | None:
+    """Whether each complete window contains a null, None if no nulls"""
+    if x.null_count == 0:
+        return None
+    return pc.greater(_window_sums(pc.is_null(x).cast("int64"), n), 0)
+
+
+def _align(out: pa.Array, size: int, n: int, align: str) -> pa.Array:
+    """Pad the complete-window results to `size` according to `align`"""
+    if align == "right":
+        before = n - 1
+    elif align == "left":
+        before = 0
+    else:
+        before = (n - 1) // 2
+    after = size - len(out) - before
+
+    return pa.concat_arrays(
+        [
+            pa.nulls(before, type=out.type),
+            out,
+            pa.nulls(after, type=out.type),
+        ]
+    )
+
+
+def _rolling(
+    x: Any,
+    n: int,
+    align: str,
+    fun: str,
+) -> pa.Array:
+    """Compute a rolling statistic and align it"""
+    _check_window(n, align)
+    x = make_array(x).storage
+    if pa.types.is_boolean(x.type):
+        x = x.cast("int64")
+    elif pa.types.is_floating(x.type):
+        # NaN would leak into every later window through the prefix sums
+        x = pc.if_else(pc.is_nan(x), pa.scalar(None, x.type), x)
+
+    size = len(x)
+    if n > size:
+        out_type = x.type if fun in ("sum", "min", "max") else pa.float64()
+        return pa.nulls(size, type=out_type)
+
+    nulls = _window_nulls(x, n)
+    filled = x.fill_null(0) if nulls is not None else x
+
+    if fun in ("min", "max"):
+        out = _window_extremes(filled, n, fun == "max")
+    elif fun == "sd":
+        out = _window_sd(filled, n)
+    else:
+        out = _window_sums(filled, n)
+        if fun == "mean":
+            out = pc.divide(out.cast("float64"), n)
+
+    if nulls is not None:
+        out = pc.if_else(nulls, pa.scalar(None, out.type), out)
+
+    return _align(out, size, n, align)
+
+
+def _moments(blocks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """The running means and sums of squared deviations along the rows of
+    the blocks
+
+    The values are shifted by the first one of each row, which keeps the
+    sums of squares small relative to the deviations.
+    """
+    first = blocks[:, :1]
+    shifted = blocks - first
+    count = np.arange(1, blocks.shape[1] + 1)
+    sums = np.cumsum(shifted, axis=1)
+    sq_sums = np.cumsum(shifted * shifted, axis=1)
+    sums /= count
+    return first + sums, sq_sums - sums * sums * count
+
+
+def _window_sd(x: pa.Array, n: int) -> pa.Array:
+    """Sample standard deviations of all complete windows
+
+    The two parts of a window are combined by Chan's formula.
+    """
+    nwin = len(x) - n + 1
+    if n == 1:
+        return pa.nulls(nwin, type=pa.float64())
+
+    blocks = _blocks(x.to_numpy(zero_copy_only=False).astype(np.float64), n, 0)
+    fmeans, fm2 = _moments(blocks)
+    # a window starting at a block is the backward part alone
+    fm2[:, -1] = 0
+    bmeans, bm2 = (arr[:, ::-1] for arr in _moments(blocks[:, ::-1]))
+
+    nafter = np.arange(nwin) % n
+    delta = _window_parts(bmeans, fmeans, len(x), n, np.subtract)
+    m2 = _window_parts(bm2, fm2, len(x), n, np.add)
+    m2 += delta * delta * ((n - nafter) * nafter / n)
+    # rounding errors may give tiny negative values for constant windows
+    return pa.array(np.sqrt(np.maximum(m2 / (n - 1), 0.0)))
+
+
+def _window_extremes(x: pa.Array, n: int, is_max: bool) -> pa.Array:
+    """Minima or maxima of all complete windows"""
+    values = x.to_numpy(zero_copy_only=False)
+    if n == 1:
+        return pa.array(values, type=x.type)
+
+    ufunc = np.maximum if is_max else np.minimum
+    if np.issubdtype(values.dtype, np.integer):
+        info = np.iinfo(values.dtype)
+        pad = info.min if is_max else info.max
+    else:
+        pad = -np.inf if is_max else np.inf
+
+    blocks = _blocks(values, n, pad)
+    forward = ufunc.accumulate(blocks, axis=1)
+    backward = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    return pa.array(
+        _window_parts(backward, forward, len(values), n, ufunc),
+        type=x.type,
+    )
+
+
+@wrap_arrow_result
+def roll_sum(x: Any, n: int, align: str = "right") -> pa.Array:
+    """Rolling sum over windows of size n
+
+    Args:
+        x: The values
+        n: The window size
+        align: How the window is aligned to the current element,
+            one of "right", "left" and "center"
+
+    Returns:
+        The rolling sums, with the same length as x
+    """
+    return _rolling(x, n, align, "sum")
+
+
+@wrap_arrow_result
+def roll_mean(x: Any, n: int, align: str = "right") -> pa.Array:
+    """Rolling mean over windows of size n
+
+    See `roll_sum()` for the arguments.
+    """
+    return _rolling(x, n, align, "mean")
+
+
+@wrap_arrow_result
+def roll_min(x: Any, n: int, align: str = "right") -> pa.Array:
+    """Rolling minimum over windows of size n
+
+    See `roll_sum()` for the arguments.
+    """
+    return _rolling(x, n, align, "min")
+
+
+@wrap_arrow_result
+def roll_max(x: Any, n: int, align: str = "right") -> pa.Array:
+    """Rolling maximum over windows of size n
+
+    See `roll_sum()` for the arguments.
+    """
+    return _rolling(x, n, align, "max")
+
+
+@wrap_arrow_result
+def roll_sd(x: Any, n: int, align: str = "right") -> pa.Array:
+    """Rolling sample standard deviation over windows of size n
+
+    See `roll_sum()` for the arguments.
+    """
+    return _rolling(x, n, align, "sd")
@@ -101,6 +101,10 @@ def is_scalar(x: Any) -> bool:
         # np.ndim({'a'}) == 0
         return False
 
+    if isinstance(x, (pa.Array, pa.ChunkedArray)):
+        # np.ndim() would convert it to a numpy array
+        return False
+
     if isinstance(x, type):
         return True
 
@@ -182,6 +182,11 @@ def test_log():
         [0, 0.6931471805599453, 1.0986122886681098],
         approx=True,
     )
+    assert_iterable_equal(
+        log([1, 3, 9, None], base=3),
+        [0, 1, 2, None],
+        approx=True,
+    )
 
 
 def test_weighted_mean():
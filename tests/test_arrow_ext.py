@@ -1,6 +1,8 @@
-import pytest  # noqa: F401
+import pytest
 import numpy as np
 import pyarrow as pa
+import datar.base  # noqa: F401, loads the plugins and their options
+from datar import options_context
 from datar_arrow.arrow_ext import DatarArray
 from .utils import assert_equal, assert_iterable_equal
 
@@ -99,3 +101,97 @@ def test_type():
     x = pa.array([1, 2, 3])
     x = DatarArray.create(x)
     assert x.type == pa.int64()
+
+
+def test_overflow_modes(caplog):
+    big = 2**62
+    imax = 2**63 - 1
+    imin = -(2**63)
+    x = DatarArray.create(pa.array([big, 1, None]))
+
+    # unchecked by default: wraps around
+    assert_iterable_equal(x + big, [imin, big + 1, None])
+
+    with options_context(arrow_overflow="checked"):
+        assert_iterable_equal(x + 1, [big + 1, 2, None])
+        with pytest.raises(pa.ArrowInvalid):
+            x + big
+
+    with options_context(arrow_overflow="na"):
+        with caplog.at_level("WARNING"):
+            assert_iterable_equal(x + big, [None, big + 1, None])
+        assert "integer overflow" in caplog.text
+        assert_iterable_equal(-x - imax, [None, imin, None])
+        assert_iterable_equal(x * 2, [None, 2, None])
+        assert_iterable_equal(x * -2, [imin, -2, None])
+        y = DatarArray.create(pa.array([-1, -1, 3, 0]))
+        assert_iterable_equal(
+            y * pa.array([imin, imax, imax, imin]),
+            [None, -imax, None, 0],
+        )
+        assert_iterable_equal(x**2, [None, 1, None])
+        assert_iterable_equal(2**x, [None, 2, None])
+        uint = DatarArray.create(pa.array([1, 2], type=pa.uint8()))
+        uint2 = pa.array([2, 1], type=pa.uint8())
+        assert_iterable_equal(uint - uint2, [None, 1])
+        assert_iterable_equal(uint + uint2, [3, 3])
+        assert_iterable_equal(uint + pa.array([255, 1], type=pa.uint8()), [None, 3])
+        assert_iterable_equal(uint * pa.array([255, 128], type=pa.uint8()), [255, None])
+
+    with options_context(arrow_overflow="whatever"):
+        with pytest.raises(ValueError):
+            x + 1
+
+
+def test_floor_divide_mod():
+    x = DatarArray.create(pa.array([7, -7, 7, -7, 5, None]))
+    y = pa.array([2, 2, -2, -2, 0, 1])
+    assert_iterable_equal(x // y, [3, -4, -4, 3, None, None])
+    assert_iterable_equal(x % y, [1, 1, -1, -1, None, None])
+
+    # exact beyond 2^53
+    big = DatarArray.create(pa.array([2**62 + 1, -(2**63)]))
+    assert_iterable_equal(big // 3, [(2**62 + 1) // 3, -(2**63) // 3])
+    assert_iterable_equal(big % 3, [(2**62 + 1) % 3, -(2**63) % 3])
+    assert_iterable_equal(big // -1, [-(2**62 + 1), None])
+    assert (big // 3).type == pa.int64()
+
+    f = DatarArray.create(pa.array([7.5, -7.5, 1.0, -1.0]))
+    assert_iterable_equal(f // 2, [3.0, -4.0, 0.0, -1.0])
+    assert_iterable_equal(f % 2, [1.5, 0.5, 1.0, 1.0])
+    assert_iterable_equal(f // 0.0, [np.inf, -np.inf, np.inf, -np.inf])
+    assert_iterable_equal(f % 0.0, [np.nan] * 4)
+    assert_iterable_equal(7 // DatarArray.create(pa.array([2, None])), [3, None])
+
+    # all NA operands of the null type
+    na = DatarArray.create(pa.array([None, None]))
+    assert_iterable_equal(na // 2, [None, None])
+    assert_iterable_equal(na % 2, [None, None])
+    assert_iterable_equal(na // na, [None, None])
+    ints = DatarArray.create(pa.array([1, 2]))
+    assert_iterable_equal(ints // pa.array([None, None]), [None, None])
+    out = DatarArray.create(pa.array([1.5, 2.0])) % pa.array([None, None])
+    assert out.type == pa.float64()
+    assert_iterable_equal(out, [None, None])
+
+
+def test_floor_divide_mod_out_of_range(caplog):
+    # widened to int64 if the scalar does not fit the type
+    small = DatarArray.create(pa.array([5, -3], type=pa.int8()))
+    assert_iterable_equal(small % 300, [5, 297])
+    assert_iterable_equal(small // -300, [-1, 0])
+
+    x = DatarArray.create(pa.array([5, -3]))
+    # computed in double by default
+    assert_iterable_equal(x % 2**64, [5.0, 2.0**64 - 3])
+    assert_iterable_equal(x // 2**64, [0.0, -1.0])
+    assert_iterable_equal(2**64 % x, [1.0, -2.0])
+
+    with options_context(arrow_overflow="checked"):
+        with pytest.raises(pa.ArrowInvalid):
+            x % 2**64
+
+    with options_context(arrow_overflow="na"):
+        with caplog.at_level("WARNING"):
+            assert_iterable_equal(x // 2**64, [None, None])
+        assert "integer overflow" in caplog.text
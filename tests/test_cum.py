@@ -1,4 +1,7 @@
+import math
+
 import pytest
+import pyarrow as pa
 
 from datar.base import (
     cummax,
@@ -28,3 +31,54 @@ from .utils import assert_iterable_equal
 )
 def test_cum(fn, x, expected):
     assert_iterable_equal(fn(x), expected)
+
+
+@pytest.mark.parametrize(
+    "fn, x, expected",
+    [
+        (cummax, [1, None, 3], [1, None, None]),
+        (cummax, [1.0, None, 3.0], [1.0, None, None]),
+        (cumprod, [2, 3, None, 4], [2, 6, None, None]),
+        (cumsum, [None, 1, 2], [None, None, None]),
+        (cumsum, [True, False, True], [1, 1, 2]),
+    ],
+)
+def test_cum_na(fn, x, expected):
+    assert_iterable_equal(fn(x), expected)
+
+
+@pytest.mark.parametrize("fn", [cummax, cummin, cumprod, cumsum])
+def test_cum_empty_or_all_na(fn):
+    assert_iterable_equal(fn([]), [])
+    assert_iterable_equal(fn([None, None]), [None, None])
+    out = fn(pa.chunked_array([[None], [None]]))
+    assert_iterable_equal(out, [None, None])
+
+
+@pytest.mark.parametrize(
+    "fn, expected",
+    [
+        (cummax, [1, 3, 3, 4, 4]),
+        (cummin, [1, 1, 1, 1, 0]),
+        (cumprod, [1, 3, 6, 24, 0]),
+        (cumsum, [1, 4, 6, 10, 10]),
+    ],
+)
+def test_cum_chunked(fn, expected):
+    x = pa.chunked_array([[1, 3], [2], [4, 0]])
+    out = fn(x)
+    assert isinstance(out, pa.Array)
+    assert_iterable_equal(out, expected)
+
+
+def test_cum_nan():
+    # NaN is carried forward, but an NA wins after it, like R
+    nan = float("nan")
+    out = cummin([3.0, nan, 1.0]).to_pylist()
+    assert out[0] == 3.0 and math.isnan(out[1]) and math.isnan(out[2])
+
+    out = cummax(pa.chunked_array([[1.0, nan], [None, 2.0]])).to_pylist()
+    assert out[0] == 1.0 and math.isnan(out[1]) and out[2:] == [None, None]
+
+    out = cummax([1.0, None, nan]).to_pylist()
+    assert out == [1.0, None, None]
@@ -9,6 +9,10 @@ from datar.base import (
     nlevels,
     is_ordered,
     ordered,
+    order,
+    sort,
+    min_,
+    max_,
     NA,
 )
 from datar_arrow.utils import make_array
@@ -28,6 +32,17 @@ def test_droplevels():
         droplevels(make_array(1), __ast_fallback="normal")
 
 
+def test_droplevels_chunked():
+    x = factor(["a", "b"], levels=["a", "b", "z"])
+    y = factor(["c", "a"])
+    out = droplevels(pa.chunked_array([x._dictionary_array, y._dictionary_array]))
+    assert_iterable_equal(out, ["a", "b", "c", "a"])
+    assert_iterable_equal(levels(out), ["a", "b", "c"])
+
+    with pytest.raises(NotImplementedError):
+        droplevels(pa.chunked_array([[1]]), __ast_fallback="normal")
+
+
 def test_levels():
     lvls = levels(1)
     assert lvls is None
@@ -50,8 +65,51 @@ def test_factor():
     assert_iterable_equal(out, [NA, 2, 3])
     assert_iterable_equal(levels(out), [2, 3])
 
-    with pytest.raises(NotImplementedError):
-        factor([1, 2, 3], ordered=True, __ast_fallback="normal")
+    out = factor([1, 2, 3], ordered=True)
+    assert out._dictionary_array.type.ordered
+
+
+def test_factor_sorted_levels():
+    out = factor(["b", "a", NA, "c", "a"])
+    assert_iterable_equal(out, ["b", "a", NA, "c", "a"])
+    assert_iterable_equal(levels(out), ["a", "b", "c"])
+    assert_iterable_equal(levels(factor([3, 1, 2, 1])), [1, 2, 3])
+
+    # the levels of a factor are kept, but not the unused ones
+    fct = factor(["a", "c"], levels=["c", "b", "a"])
+    assert_iterable_equal(levels(factor(fct)), ["c", "a"])
+
+    out = factor(fct, levels=["a", "b"])
+    assert_iterable_equal(out, ["a", NA])
+
+
+def test_factor_reuses_dictionary():
+    fct = factor(["a", "b", "a"], levels=["a", "b", "c"])
+    out = factor(fct, levels=["a", "b", "c"])
+    assert out.indices is fct.indices
+
+
+def test_factor_labels():
+    out = factor(["x", "y", "x", "z"], labels=["A", "B", "C"])
+    assert_iterable_equal(out, ["A", "B", "A", "C"])
+    assert_iterable_equal(levels(out), ["A", "B", "C"])
+
+    # the levels with the same label are merged
+    out = factor(["x", "y", "x", "z"], labels=["A", "B", "A"])
+    assert_iterable_equal(out, ["A", "B", "A", "A"])
+    assert_iterable_equal(levels(out), ["A", "B"])
+
+    out = factor([3, 1, 2], labels="L")
+    assert_iterable_equal(out, ["L3", "L1", "L2"])
+
+    with pytest.raises(ValueError):
+        factor([1, 2, 3], labels=["a", "b"])
+
+
+def test_factor_nmax():
+    assert_iterable_equal(levels(factor([1, 2, 3, 2], nmax=3)), [1, 2, 3])
+    with pytest.raises(ValueError):
+        factor([1, 2, 3], nmax=2)
 
 
 def test_as_factor():
@@ -91,8 +149,48 @@ def test_is_ordered():
     assert not iso1
     iso2 = is_ordered(factor())
     assert not iso2
+    assert is_ordered(ordered([1, 2]))
+    assert is_ordered(ordered([1, 2])._dictionary_array)
 
 
 def test_ordered():
-    with pytest.raises(NotImplementedError):
-        ordered([1, 2, 3], __ast_fallback="normal")
+    out = ordered(["lo", "hi", NA, "mid"], levels=["lo", "mid", "hi"])
+    assert_iterable_equal(out, ["lo", "hi", NA, "mid"])
+    assert_iterable_equal(levels(out), ["lo", "mid", "hi"])
+    assert is_ordered(droplevels(out))
+
+
+def test_ordered_comparisons():
+    lvls = ["lo", "mid", "hi"]
+    x = ordered(["lo", "hi", "mid", NA], levels=lvls)
+    # by the positions of the levels, not the strings
+    assert_iterable_equal(x < "mid", [True, False, False, NA])
+    assert_iterable_equal(x >= "mid", [False, True, True, NA])
+    assert_iterable_equal(x > "zzz", [NA, NA, NA, NA])
+    assert_iterable_equal(x == "mid", [False, False, True, NA])
+
+    y = ordered(["hi", "lo", "hi", "lo"], levels=lvls)
+    assert_iterable_equal(x < y, [True, False, True, NA])
+    assert_iterable_equal(x > make_array(["mid"] * 4), [False, True, False, NA])
+    assert_iterable_equal(x < ["mid"] * 4, [True, False, False, NA])
+    assert_iterable_equal(("mid", "lo", "lo", "hi") <= x, [False, True, True, NA])
+    with pytest.raises(ValueError):
+        x < ordered(["lo"], levels=["lo", "hi"])
+
+
+def test_factor_order_sort_min_max():
+    x = ordered(["lo", "hi", NA, "mid", "hi"], levels=["lo", "mid", "hi"])
+    assert_iterable_equal(order(x), [0, 3, 1, 4, 2])
+    assert_iterable_equal(order(x, decreasing=True, na_last=False), [2, 1, 4, 3, 0])
+
+    out = sort(x)
+    assert_iterable_equal(out, ["lo", "mid", "hi", "hi", NA])
+    assert is_ordered(out)
+
+    assert_equal(min_(x), NA)
+    assert_equal(min_(x, na_rm=True), "lo")
+    assert_equal(max_(x, na_rm=True), "hi")
+
+    # unordered factors are also sorted by the levels
+    out = sort(factor(["b", "a", "c"], levels=["c", "b", "a"]))
+    assert_iterable_equal(out, ["c", "b", "a"])
@@ -0,0 +1,98 @@
+import pyarrow as pa
+import datar.base  # noqa: F401, loads the plugins and their options
+from datar import options_context
+from datar.base import is_element, match, intersect, setdiff, union
+
+from datar_arrow.lookup import LookupSet
+from .utils import assert_equal, assert_iterable_equal
+
+
+def test_lookup_set():
+    s = LookupSet([5, 3, None, 3, 7])
+    assert len(s) == 4
+    assert s.has_na
+    assert s.nbytes > 0
+    assert s.values.to_pylist() == [5, 3, None, 7]
+    assert_iterable_equal(s.first, [0, 1, 4])
+    assert_iterable_equal(s.contains([3, 4, None, 7]), [True, False, True, True])
+    assert s.index([3, 4, None, 7, 5]).to_pylist() == [1, None, 2, 4, 0]
+
+    s = LookupSet(["b", "a", "b"])
+    assert_iterable_equal(s.contains(["a", "z", None]), [True, False, False])
+    assert s.index(["a", "b", "z"]).to_pylist() == [1, 0, None]
+
+    assert_iterable_equal(LookupSet([]).contains([1]), [False])
+
+
+def test_lookup_set_binary_search():
+    # small batches against many integers are binary searched
+    s = LookupSet(list(range(1998, -1, -2)))
+    assert_iterable_equal(
+        s.contains([4, 5, None, 1998, 5000]),
+        [True, False, False, True, False],
+    )
+    assert s.index([4, 5, None, 0]).to_pylist() == [997, None, None, 999]
+
+
+def test_lookup_set_indexes():
+    # dense integers are looked up by a direct index, batches of any size
+    s = LookupSet([7, 5, 6, 5, None])
+    assert s._dense is not None
+    assert s.index([5, 4, 8, None, 7, -(2**63)]).to_pylist() == [
+        1, None, None, 4, 0, None
+    ]
+    # floats are binary searched, NaN matching NaN, -0.0 not matching 0.0
+    s = LookupSet([float(x) for x in range(100)] + [float("nan"), -0.0])
+    assert s._sorted is not None
+    assert s.index([float("nan"), 0.0, -0.0, 2.5, 99.0]).to_pylist() == [
+        100, 0, 101, None, 99
+    ]
+    # strings of small batches are looked up in a dict
+    s = LookupSet([f"s{i}" for i in range(100)] + [None])
+    assert s.index(["s3", "x", None, "s99"]).to_pylist() == [3, None, 100, 99]
+    assert s._positions is not None
+    assert s.nbytes > s.values.nbytes + s.first.nbytes
+
+
+def test_lookup_set_cache():
+    LookupSet.clear_cache()
+    s = LookupSet.cached([1, 2, 3])
+    assert LookupSet.cached([1, 2, 3]) is s
+    assert LookupSet.cached([1, 2, 4]) is not s
+
+    with options_context(arrow_lookup_cache_size=s.nbytes):
+        # evicts the least recently used ones
+        t = LookupSet.cached([4, 5, 6])
+        assert LookupSet.cached([4, 5, 6]) is t
+        assert LookupSet.cached([1, 2, 3]) is not s
+
+    LookupSet.clear_cache()
+    assert LookupSet.cached([1, 2, 3]) is not s
+    # slices are cached by their own content
+    x = pa.array([0, 1, 2, 3, None, 5])
+    s = LookupSet.cached(x.slice(1, 3))
+    assert LookupSet.cached(pa.array([1, 2, 3])) is s
+    assert LookupSet.cached(x.slice(2, 3)) is not s
+    t = LookupSet.cached(pa.array(["x", "a", "b"]).slice(1))
+    assert LookupSet.cached(["a", "b"]) is t
+    LookupSet.clear_cache()
+
+
+def test_lookup_set_functions():
+    s = LookupSet([3, 4, 5, 3])
+    assert_equal(is_element(3, s), True)
+    assert_iterable_equal(is_element([1, 3], s), [False, True])
+    assert_iterable_equal(match([5, 1, 3], s), [2, -1, 0])
+    assert_iterable_equal(intersect([1, 5, 3, 5], s), [5, 3])
+    assert_iterable_equal(setdiff([1, 5, 2, 1], s), [1, 2])
+    assert_iterable_equal(union([1, 3], s), [1, 3, 4, 5])
+
+
+def test_lookup_set_match_coerce():
+    # coerced to a common type like a plain table
+    assert_iterable_equal(match(["1", "2"], LookupSet([1, 2])), [0, 1])
+    assert_iterable_equal(match(["2", "x", None], LookupSet([3, 2, None])), [1, -1, 2])
+    assert_iterable_equal(match(["2", None], LookupSet([3, 2])), [1, -1])
+    assert_iterable_equal(match([2, None], LookupSet(["3", "2"])), [1, -1])
+    assert_iterable_equal(match([True, False], LookupSet(["FALSE"])), [-1, 0])
+    assert_iterable_equal(match([1.0, 2.5], LookupSet([2, 1])), [1, -1])
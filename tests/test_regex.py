@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from datar_arrow.regex import regexpr, gregexpr, regmatches
+from .utils import assert_iterable_equal
+
+TEXT = ["baaac ab", None, "xyz", "héé aé", ""]
+
+
+def test_regexpr():
+    assert_iterable_equal(regexpr("a+|é", TEXT), [1, None, -1, 1, -1])
+    assert_iterable_equal(regexpr("A", TEXT, ignore_case=True), [1, None, -1, 4, -1])
+    assert_iterable_equal(regexpr(".", ["a.b", "ab"], fixed=True), [1, -1])
+    assert_iterable_equal(regexpr("x", "yx"), [1])
+
+
+def test_gregexpr():
+    out = gregexpr("a+|é", TEXT)
+    assert out.to_pylist() == [[1, 6], None, [-1], [1, 2, 4, 5], [-1]]
+
+
+def test_regmatches():
+    assert_iterable_equal(
+        regmatches(TEXT, "a+|é"), ["aaa", None, None, "é", None]
+    )
+    out = regmatches(TEXT, "a+|é", all=True)
+    assert out.to_pylist() == [["aaa", "a"], None, [], ["é", "é", "a", "é"], []]
+
+
+def test_regex_separator_in_text():
+    # The matches are still located when the text has control characters
+    text = ["a\x00b\x01", "\x00\x00bb"]
+    assert_iterable_equal(regexpr("b+", text), [2, 2])
+    assert regmatches(text, "b+", all=True).to_pylist() == [["b"], ["bb"]]
+
+    with pytest.raises(ValueError):
+        regexpr("a", ["".join(map(chr, range(32)))])
+
+
+def test_regex_against_re():
+    text = ["key=1; key=22", "no match", "key=333 key=", "ké=1 key=4444"]
+    pattern = r"key=\d+"
+    assert regmatches(text, pattern, all=True).to_pylist() == [
+        re.findall(pattern, elem) for elem in text
+    ]
+    assert gregexpr(pattern, text).to_pylist() == [
+        [m.start() for m in re.finditer(pattern, elem)] or [-1] for elem in text
+    ]
@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+
+from datar_arrow.rolling import roll_sum, roll_mean, roll_min, roll_max, roll_sd
+from .utils import assert_iterable_equal
+
+
+def _naive(x, n, fun, align="right"):
+    out = [None] * len(x)
+    before = {"right": n - 1, "left": 0, "center": (n - 1) // 2}[align]
+    for i in range(len(x) - n + 1):
+        win = x[i : i + n]
+        if any(v is None for v in win):
+            continue
+        out[i + before] = fun(win)
+    return out
+
+
+def test_roll_sum():
+    assert_iterable_equal(roll_sum([1, 2, 3, 4, 5], 2), [None, 3, 5, 7, 9])
+    assert_iterable_equal(
+        roll_sum([1, 2, 3, 4, 5], 3, align="left"), [6, 9, 12, None, None]
+    )
+    assert_iterable_equal(
+        roll_sum([1, 2, 3, 4, 5], 3, align="center"), [None, 6, 9, 12, None]
+    )
+    assert_iterable_equal(
+        roll_sum([1, None, 3, 4, 5], 2), [None, None, None, 7, 9]
+    )
+    assert_iterable_equal(roll_sum([1, 2], 3), [None, None])
+    assert_iterable_equal(roll_sum([1.0, float("nan"), 3.0], 1), [1.0, None, 3.0])
+
+
+def test_roll_mean():
+    assert_iterable_equal(roll_mean([1, 2, 3, 4], 2), [None, 1.5, 2.5, 3.5])
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 7])
+@pytest.mark.parametrize("align", ["right", "left", "center"])
+def test_roll_min_max(n, align):
+    rng = np.random.default_rng(8525)
+    x = rng.integers(-100, 100, 23).tolist()
+    x[5] = None
+    assert_iterable_equal(roll_min(x, n, align), _naive(x, n, min, align))
+    assert_iterable_equal(roll_max(x, n, align), _naive(x, n, max, align))
+
+
+def test_roll_sd():
+    x = [1.0, 2.0, 4.0, 8.0, 8.0, 8.0, None, 1.0]
+    assert_iterable_equal(
+        roll_sd(x, 3),
+        _naive(x, 3, lambda w: float(np.std(w, ddof=1))),
+        approx=True,
+    )
+    assert_iterable_equal(roll_sd([1, 2], 1), [None, None])
+
+
+def test_roll_spike():
+    # a large value does not wipe out the later windows
+    assert_iterable_equal(roll_sum([1e16, 1, 1, 1, 1], 2), [None, 1e16, 2, 2, 2])
+    assert_iterable_equal(
+        roll_mean([1e16, 1, 2, 3, 4], 2), [None, 5e15, 1.5, 2.5, 3.5]
+    )
+    out = roll_sd([1e9, 1, 2, 3, 4], 2)
+    assert_iterable_equal(out[2:], [0.5**0.5] * 3, approx=True)
+
+
+@pytest.mark.parametrize("n", [2, 3, 10, 64])
+def test_roll_large_offset(n):
+    rng = np.random.default_rng(8525)
+    x = rng.normal(1e6, 1, 20_000)
+    x[::997] = 1e12
+    windows = np.lib.stride_tricks.sliding_window_view(x, n)
+
+    out = np.array(roll_mean(x, n).to_pylist()[n - 1 :])
+    assert np.allclose(out, windows.mean(axis=1), rtol=1e-12, atol=0)
+    out = np.array(roll_sd(x, n).to_pylist()[n - 1 :])
+    expected = windows.std(axis=1, ddof=1)
+    assert np.allclose(out, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_roll_invalid():
+    with pytest.raises(ValueError):
+        roll_sum([1, 2], 0)
+    with pytest.raises(ValueError):
+        roll_sum([1, 2], 1, align="middle")
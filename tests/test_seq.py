@@ -1,3 +1,5 @@
+import datetime
+
 import pytest
 import pyarrow as pa
 from datar.base import (
@@ -14,8 +16,13 @@ from datar.base import (
     seq_along,
     seq_len,
     match,
+    factor,
+    levels,
+    is_factor,
+    is_ordered,
     NA,
 )
+from datar_arrow.arrow_ext import DatarArray
 from .utils import assert_equal, assert_iterable_equal
 
 
@@ -56,6 +63,31 @@ def test_c():
     assert_iterable_equal(c([1, 2], [3, 4]), [1, 2, 3, 4])
     assert_iterable_equal(c([[1, 2], [3, 4]], [5, 6]), [1, 2, 3, 4, 5, 6])
     assert_iterable_equal(c(c(1, 2), 3), [1, 2, 3])
+    assert_iterable_equal(c(pa.array([1, 2]), pa.chunked_array([[3]])), [1, 2, 3])
+
+
+def test_c_factors():
+    # the levels of the first factor, followed by the new ones
+    out = c(factor(["b", "a"], levels=["b", "a"]), factor(["c", NA, "a"]))
+    assert_iterable_equal(out, ["b", "a", "c", NA, "a"])
+    assert_iterable_equal(levels(out), ["b", "a", "c"])
+
+    x = factor(["x"], levels=["x", "y"], ordered=True)
+    assert is_ordered(c(x, x))
+    assert not is_ordered(c(x, factor(["y"], ordered=True)))
+
+    # levels of different types are combined as strings, like R
+    out = c(factor(["a", "b"]), factor([1, NA]), factor([True]))
+    assert is_factor(out)
+    assert_iterable_equal(out, ["a", "b", "1", NA, "TRUE"])
+    assert_iterable_equal(levels(out), ["a", "b", "1", "TRUE"])
+    out = c(factor(pa.array([1], pa.int8())), factor([2]))
+    assert_iterable_equal(levels(out), [1, 2])
+
+    # decoded when not all of them are factors
+    out = c(factor(["a"]), "b")
+    assert_iterable_equal(out, ["a", "b"])
+    assert not is_factor(out)
 
 
 def test_length():
@@ -115,6 +147,19 @@ def test_rank():
 
 def test_rev():
     assert_iterable_equal(rev([1, 2, 3]), [3, 2, 1])
+    assert_iterable_equal(rev([1.5, NA, 3.0]), [3.0, NA, 1.5])
+    assert_iterable_equal(rev(["a", "b"]), ["b", "a"])
+    assert_iterable_equal(rev([True, False, False]), [False, False, True])
+    assert_iterable_equal(rev([]), [])
+
+    out = rev(pa.chunked_array([[1, 2], [3]]))
+    assert isinstance(out, DatarArray)
+    assert_iterable_equal(out, [3, 2, 1])
+
+    fct = factor(["a", "b", "c"], levels=["c", "b", "a"])
+    out = rev(fct)
+    assert_iterable_equal(out, ["c", "b", "a"])
+    assert out.dictionary.to_pylist() == ["c", "b", "a"]
 
 
 def test_sample():
@@ -146,3 +191,26 @@ def test_seq_len():
 def test_match():
     assert_iterable_equal(match([1, 2, 3], [2, 3, 4]), [-1, 0, 1])
     assert_iterable_equal(match([1, 2, 3], [2, 3, 4], nomatch=0), [0, 0, 1])
+    # first occurrences in table
+    assert_iterable_equal(match([2, 1], [3, 2, 1, 2, 1]), [1, 2])
+    # NA matches NA
+    assert_iterable_equal(match([2, None, 5], [2, 2, None, 1]), [0, 2, -1])
+    assert_iterable_equal(match(["a", "z"], ["z", "a"]), [1, 0])
+    assert_iterable_equal(match([1, 5], [1.0, 2.5], nomatch=None), [0, None])
+    assert_iterable_equal(match([1], [None]), [-1])
+
+
+def test_match_coerce():
+    # coerced to a common type as R does
+    assert_iterable_equal(match(["1"], [1]), [0])
+    assert_iterable_equal(match([2.5, 1, None], ["1", "2.5"]), [1, 0, -1])
+    assert_iterable_equal(match([True, False], ["FALSE"]), [-1, 0])
+    assert_iterable_equal(match([True, False], [0, 1]), [1, 0])
+    assert_iterable_equal(
+        match(pa.array([2**63, 1], pa.uint64()), [-1, 1]), [-1, 1]
+    )
+    assert_iterable_equal(match(factor(["a", "1"]), [1]), [-1, 0])
+    # not comparable
+    assert_iterable_equal(
+        match([1, 2], pa.array([datetime.date(2020, 1, 1)])), [-1, -1]
+    )
@@ -1,3 +1,5 @@
+from datetime import date, timedelta
+
 import pytest
 import pyarrow as pa
 from datar.base import (
@@ -16,8 +18,11 @@ from datar.base import (
     head,
     tail,
     NA,
+    factor,
+    levels,
 )
 
+from datar_arrow.arrow_ext import DatarArray
 from datar_arrow.utils import make_array
 from .utils import assert_iterable_equal, assert_equal
 
@@ -26,6 +31,12 @@ def test_all_():
     assert_equal(all_([True, True, True]), True)
     assert_equal(all_([True, True, False]), False)
     assert_equal(all_([True, True, NA]), NA)
+    # a False decides regardless of NA
+    assert_equal(all_([True, False, NA]), False)
+    assert_equal(all_([True, True, NA], na_rm=True), True)
+    assert_equal(all_([NA], na_rm=True), True)
+    assert_equal(all_([]), True)
+    assert_equal(all_([1.0, float("nan")]), NA)
 
 
 def test_any_():
@@ -34,6 +45,22 @@ def test_any_():
     assert_equal(any_([False, False, False]), False)
     assert_equal(any_(pa.scalar(True)), True)
     assert_equal(any_(True), True)
+    assert_equal(any_([NA, True]), True)
+    assert_equal(any_([False, NA]), NA)
+    assert_equal(any_([False, NA], na_rm=True), False)
+    assert_equal(any_([]), False)
+
+
+def test_all_any_chunked():
+    x = pa.chunked_array([[True, None], [None, None], [False]])
+    assert_equal(all_(x), False)
+    assert_equal(any_(x), True)
+    assert_equal(any_(pa.chunked_array([[False, None], [False]])), NA)
+    assert_equal(all_(pa.chunked_array([[None, None]], type=pa.bool_())), NA)
+    assert_equal(
+        all_(pa.chunked_array([[None, None], [True]], type=pa.bool_()), na_rm=True),
+        True,
+    )
 
 
 def test_any_na():
@@ -42,6 +69,10 @@ def test_any_na():
     assert_equal(any_na([False, False, False]), False)
     assert_equal(any_na([False, False, NA]), True)
     assert_equal(any_na([NA, NA, NA]), True)
+    assert_equal(any_na([1.0, float("nan")]), True)
+    assert_equal(any_na(pa.chunked_array([[1, 2], [None]])), True)
+    assert_equal(any_na(NA), True)
+    assert_equal(any_na(1), False)
 
 
 def test_append():
@@ -51,13 +82,46 @@ def test_append():
     assert_iterable_equal(append([1, 2, 3], 4, after=1), [1, 2, 4, 3])
     assert_iterable_equal(append([1, 2, 3], 4, after=-1), [1, 2, 3, 4])
     assert_iterable_equal(append([1, 2, 3], 4, after=-2), [1, 2, 4, 3])
+    assert_iterable_equal(append([1, 2, 3], [4, 5], after=0), [1, 4, 5, 2, 3])
+    assert_iterable_equal(append([1, 2], 4, after=10), [1, 2, 4])
+    assert_iterable_equal(append([1, 2], 0.5), [1, 2, 0.5])
+    assert_iterable_equal(append([], [1]), [1])
+    x = pa.chunked_array([[1, 2], [3]])
+    assert_iterable_equal(append(x, [None], after=1), [1, 2, None, 3])
 
 
 def test_diff():
     assert_iterable_equal(diff([1, 2, 3, 4, 5]), [1, 1, 1, 1])
     assert_iterable_equal(diff([1, 2, 3, 4, 5], differences=2), [0, 0, 0])
+    assert_iterable_equal(diff([1, 2, 4, 7, 11], lag=2), [3, 5, 7])
+    assert_iterable_equal(diff([1, 2, 4, 7, 11], lag=2, differences=2), [4])
+    assert_iterable_equal(diff([1, None, 4, 7]), [None, None, 3])
+    assert_iterable_equal(diff([1, 2], lag=3), [])
+    assert_iterable_equal(diff([True, False, True]), [-1, 1])
+    assert_iterable_equal(diff(pa.chunked_array([[1, 3], [6, 10]])), [2, 3, 4])
+    dates = pa.array([date(2020, 1, 1), date(2020, 1, 5)])
+    assert_iterable_equal(diff(dates), [timedelta(days=4)])
     with pytest.raises(ValueError):
-        diff([1, 2, 3, 4, 5], lag=2)
+        diff([1, 2, 3, 4, 5], lag=0)
+
+
+def test_diff_negative_lag():
+    # x[lag:] - x[:-lag], the last -lag elements minus the first ones
+    assert_iterable_equal(diff([1, 2, 4, 7, 11], lag=-2), [6, 9])
+    assert_iterable_equal(diff([1, 2, 4, 7, 11], lag=-2, differences=2), [0, 0])
+    assert_iterable_equal(diff([1, 2, 4], lag=-5), [0, 0, 0])
+    assert_iterable_equal(
+        diff(pa.chunked_array([[1, 3], [6, 10]]), lag=-1), [9]
+    )
+
+
+def test_diff_no_wrap():
+    from datar import options_context
+
+    assert_iterable_equal(diff(pa.array([5, 1, 255], pa.uint8())), [-4, 254])
+    assert_iterable_equal(diff(pa.array([-128, 127], pa.int8())), [255])
+    with options_context(arrow_overflow="na"):
+        assert_iterable_equal(diff([-(2**63), 2**63 - 1]), [None])
 
 
 def test_duplicated():
@@ -80,15 +144,24 @@ def test_duplicated():
 
 def test_intersect():
     assert_iterable_equal(intersect([1, 2, 3], [3, 4, 5]), [3])
+    # order of x, no duplicates
+    assert_iterable_equal(intersect([5, 1, 3, 5, 3], [3, 5, 5, 4]), [5, 3])
+    assert intersect([1, None], [None, 2]).to_pylist() == [None]
+    assert_iterable_equal(intersect([], [1]), [])
 
 
 def test_setdiff():
     assert_iterable_equal(setdiff([1, 2, 3], [3, 4, 5]), [1, 2])
+    assert_iterable_equal(setdiff([2, 1, 2, 3], [3]), [2, 1])
+    assert_iterable_equal(setdiff([1, 2], []), [1, 2])
 
 
 def test_setequal():
     assert_equal(setequal([1, 2, 3], [3, 4, 5]), False)
     assert_equal(setequal([1, 2, 3], [3, 2, 1]), True)
+    assert_equal(setequal([1, 2, 2, None], [None, 2, 1]), True)
+    assert_equal(setequal([1, 2], [1, 2, 3]), False)
+    assert_equal(setequal([], []), True)
 
 
 def test_unique():
@@ -99,16 +172,72 @@ def test_unique():
 
 def test_union():
     assert_iterable_equal(union([1, 2, 3], [3, 4, 5]), [1, 2, 3, 4, 5])
+    assert_iterable_equal(union([3, 1, 3], [2, 1]), [3, 1, 2])
+    assert_iterable_equal(union([], [1, 1]), [1])
+
+
+def test_set_ops_chunked_and_factor():
+    x = pa.chunked_array([[3, 1], [3, 2]])
+    assert_iterable_equal(union(x, [4, 1]), [3, 1, 2, 4])
+    assert_iterable_equal(intersect(x, [2, 3]), [3, 2])
+    assert_iterable_equal(setdiff(x, [3]), [1, 2])
+    assert_equal(setequal(x, [1, 2, 3]), True)
+
+    f = factor(["b", "a", "b", "c"])
+    assert_iterable_equal(intersect(f, ["c", "b"]), ["b", "c"])
+    assert_iterable_equal(setdiff(f, ["a"]), ["b", "c"])
+    assert_iterable_equal(union(f, ["d", "a"]), ["b", "a", "c", "d"])
+    assert_equal(setequal(f, ["c", "b", "a"]), True)
+
+
+def test_factor_levels_unified():
+    x = factor(["b", "a"])
+    y = factor(["c", "a", NA])
+
+    out = append(x, y, after=0)
+    assert_iterable_equal(out, ["b", "c", "a", NA, "a"])
+    assert_iterable_equal(levels(out), ["a", "b", "c"])
+
+    out = union(x, y)
+    assert_iterable_equal(out, ["b", "a", "c", NA])
+    assert_iterable_equal(levels(out), ["a", "b", "c"])
 
 
 def test_head():
     assert_iterable_equal(head([1, 2, 3, 4, 5, 6, 7]), [1, 2, 3, 4, 5, 6])
     assert_iterable_equal(head([1, 2, 3, 4, 5], 2), [1, 2])
+    assert_iterable_equal(head([1, 2, 3, 4, 5], -2), [1, 2, 3])
+    assert_iterable_equal(head([1, 2, 3], -5), [])
+    assert_iterable_equal(head([1, 2, 3], 0), [])
 
 
 def test_tail():
     assert_iterable_equal(tail([1, 2, 3, 4, 5, 6, 7]), [2, 3, 4, 5, 6, 7])
     assert_iterable_equal(tail([1, 2, 3, 4, 5], 2), [4, 5])
+    assert_iterable_equal(tail([1, 2, 3, 4, 5], -2), [3, 4, 5])
+    assert_iterable_equal(tail([1, 2, 3], -5), [])
+    assert_iterable_equal(tail([1, 2, 3], 0), [])
+
+
+def test_head_tail_zero_copy():
+    x = make_array(list(range(10)))
+    out = head(x, 3)
+    assert out.storage.buffers()[1].address == x.storage.buffers()[1].address
+
+    chunked = pa.chunked_array([[1, 2], [3, 4, 5]])
+    out = tail(chunked, 4)
+    assert isinstance(out, DatarArray)
+    assert_iterable_equal(out, [2, 3, 4, 5])
+    assert_iterable_equal(head(chunked, -1), [1, 2, 3, 4])
+    # a single chunk is not copied
+    out = tail(chunked, 3)
+    assert isinstance(out, DatarArray)
+    assert out.storage.buffers()[1].address == chunked.chunk(1).buffers()[1].address
+
+    fct = factor(["a", "b", "c", "a"], levels=["c", "b", "a"])
+    out = tail(fct, 2)
+    assert_iterable_equal(out, ["c", "a"])
+    assert out.dictionary.to_pylist() == ["c", "b", "a"]
 
 
 def test_outer():
@@ -121,3 +250,42 @@ def test_outer():
     assert len(out) == 2
     assert_iterable_equal(out[0], [2, 3, 4])
     assert_iterable_equal(out[1], [3, 4, 5])
+
+    assert pa.types.is_fixed_size_list(out.type)
+    assert out.storage.to_pylist() == [[2, 3, 4], [3, 4, 5]]
+    assert outer([1, 2], []).storage.to_pylist() == [[], []]
+    assert len(outer([], [1, 2])) == 0
+
+    # custom functions are called for each element of x with the whole y
+    out = outer([1, 2], [1.0, 2.0, 3.0, 4.0], fun=lambda a, b: b / len(b) * a)
+    assert out.storage.to_pylist() == [[0.25, 0.5, 0.75, 1.0], [0.5, 1.0, 1.5, 2.0]]
+    with pytest.raises(ValueError):
+        outer([1, 2], [1, 2, 3], fun=lambda a, b: a)
+
+
+def test_outer_blocks():
+    from datar import options_context
+    from datar_arrow.outer import outer_blocks
+
+    blocks = list(outer_blocks([1, 2, 3], [1, 2], block_size=4))
+    assert [len(block) for block in blocks] == [2, 1]
+    assert blocks[1].to_pylist() == [[3, 6]]
+    # at least one row in a block
+    blocks = list(outer_blocks([1, 2], [1, 2, 3], "add", block_size=1))
+    assert [block.to_pylist() for block in blocks] == [[[2, 3, 4]], [[3, 4, 5]]]
+
+    with options_context(arrow_outer_block_size=3):
+        out = outer([1, 2, 3], [1, 2, 3, 4], fun=lambda a, b: a - b)
+    assert out.storage.to_pylist() == [
+        [0, -1, -2, -3],
+        [1, 0, -1, -2],
+        [2, 1, 0, -1],
+    ]
+
+    # the blocks are collected into one array, with the missing values kept
+    with options_context(arrow_outer_block_size=3):
+        out = outer([1, None, 3], [1.5, 2])
+    assert out.storage.to_pylist() == [[1.5, 2.0], [None, None], [4.5, 6.0]]
+    with options_context(arrow_outer_block_size=1):
+        out = outer(["a", "b"], ["x", "y"], fun=lambda a, b: [a + v for v in b])
+    assert out.storage.to_pylist() == [["ax", "ay"], ["bx", "by"]]
@@ -21,8 +21,10 @@ from datar.base import (
     chartr,
     nchar,
     nzchar,
+    factor,
     NA,
 )
+from datar_arrow.api.string import _analyze_pattern
 from .utils import assert_equal, assert_iterable_equal
 
 
@@ -40,6 +42,54 @@ def test_grep():
     assert_iterable_equal(grep("B", ["a", "b1", "c"], ignore_case=True), [1])
 
 
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("abc", ("literal", "abc")),
+        (r"a\.b", ("literal", "a.b")),
+        ("^ab", ("prefix", "ab")),
+        ("ab$", ("suffix", "ab")),
+        (r"ab\$", ("literal", "ab$")),
+        ("^ab$", ("exact", "ab")),
+        ("", ("literal", "")),
+        ("a.b", ("regex", None)),
+        (r"a\d", ("regex", None)),
+        ("a$b", ("regex", None)),
+        ("a\\", ("regex", None)),
+    ],
+)
+def test_analyze_pattern(pattern, expected):
+    assert _analyze_pattern(pattern) == expected
+
+
+def test_grepl_literal_patterns():
+    x = ["abc", "xab", "ab", "a.b", None]
+    assert_iterable_equal(grepl("^ab", x), [True, False, True, False, None])
+    assert_iterable_equal(grepl("ab$", x), [False, True, True, False, None])
+    assert_iterable_equal(grepl("^ab$", x), [False, False, True, False, None])
+    assert_iterable_equal(
+        grepl("^AB$", x, ignore_case=True), [False, False, True, False, None]
+    )
+    assert_iterable_equal(grepl(r"a\.b", x), [False, False, False, True, None])
+    assert_iterable_equal(grepl("a.b", x), [False, False, False, True, None])
+
+
+def test_grepl_vectorized_patterns():
+    x = ["apple", "banana", "cherry", None, "date"]
+    assert_iterable_equal(
+        grepl(["^a", "z", "rr", "a", None], x),
+        [True, False, True, None, None],
+    )
+    assert_iterable_equal(
+        grepl({"an", "^d"}, x), [False, True, False, None, True]
+    )
+    assert_iterable_equal(
+        grepl({"a.", "(e"}, ["a.b", "ab", "x(e"], fixed=True),
+        [True, False, True],
+    )
+    assert_iterable_equal(grep({"AN", "ch"}, x, ignore_case=True), [1, 2])
+
+
 def test_grep_pattern_warns(caplog):
     with caplog.at_level("WARNING"):
         grep(["a", "b"], "a")
@@ -66,15 +116,102 @@ def test_sub():
     assert_equal(sub("b", "B", "abcb"), "aBcb")
     assert_equal(sub("b", "B", "abcb", fixed=True), "aBcb")
 
-    with pytest.raises(NotImplementedError):
-        sub("b", "B", "abcb", ignore_case=True, __ast_fallback="normal")
-    # assert_equal(sub("b", "B", "abcb", ignore_case=True), "aBcb")
+    assert_equal(sub("b", "X", "aBcb", ignore_case=True), "aXcb")
+    assert_equal(sub("(b)", "[\\1]", "aBcb", ignore_case=True), "a[B]cb")
+    assert_equal(sub("B.", "X", "abcb.", ignore_case=True, fixed=True), "abcX")
+    assert_equal(
+        sub("a b", "\\1", "A B", ignore_case=True, fixed=True), "\\1"
+    )
 
 
 def test_gsub():
     assert_equal(gsub("b", "B", "abcb"), "aBcB")
+    assert_equal(gsub(r"\.", "-", "a.b.c"), "a-b-c")
+    assert_equal(gsub("(b)", "\\1\\1", "abcb"), "abbcbb")
     assert_equal(gsub("b", "B", "abcb", fixed=True), "aBcB")
-    # assert_equal(gsub("b", "B", "abcb", ignore_case=True), "aBcB")
+    assert_equal(gsub("b", "X", "aBcb", ignore_case=True), "aXcX")
+    assert_iterable_equal(
+        gsub("é", "e", ["CAFÉ", "café", None], ignore_case=True),
+        ["CAFe", "cafe", None],
+    )
+
+
+def test_sub_vectorized_patterns():
+    x = ["a-b-c", "a.b.c", "a_b_c"]
+    assert_iterable_equal(
+        gsub(["-", r"\.", "_"], "", x), ["abc", "abc", "abc"]
+    )
+    assert_iterable_equal(
+        sub("b", ["1", "2", "\\0\\0"], x), ["a-1-c", "a.2.c", "a_bb_c"]
+    )
+    assert_iterable_equal(
+        gsub({".", "_"}, "+", x, fixed=True), ["a-b-c", "a+b+c", "a+b+c"]
+    )
+    assert_iterable_equal(
+        gsub({"A", "C"}, "\\", x, ignore_case=True, fixed=True),
+        ["\\-b-\\", "\\.b.\\", "\\_b_\\"],
+    )
+
+
+def test_vectorized_patterns_distinct():
+    # Mostly distinct patterns, still matched by the RE2 kernels
+    x = ["a.b", "A-B", "xab", "ab", None, "a+b"]
+    assert_iterable_equal(
+        grepl(["^a", "b$", "^ab$", "a.b", "a", "+"], x, fixed=True),
+        [False, False, False, False, None, True],
+    )
+    assert_iterable_equal(
+        grepl(["^a", "b$", "^ab$", r"a\.b", "a", "[+]"], x),
+        [True, False, False, False, None, True],
+    )
+    assert_iterable_equal(
+        grepl([".", "a-", "B", "ab", "a", "A"], x, ignore_case=True, fixed=True),
+        [True, True, True, True, None, True],
+    )
+    assert_iterable_equal(
+        grepl(["a", "a", "b", "z", "c", "+"], x, fixed=True, invert=True),
+        [False, True, False, True, None, False],
+    )
+    assert_iterable_equal(
+        sub(
+            [r"(a)\.", "(a)", "a", "(b)", "x", "b"],
+            ["<\\1>", "[\\0]", "z", "\\1\\1", "y", "\\\\"],
+            x,
+            ignore_case=True,
+        ),
+        ["<a>b", "[A]-B", "xzb", "abb", None, "a+\\"],
+    )
+    assert_iterable_equal(
+        gsub(
+            ["b", "-", "a", ".", "x", "+"],
+            ["\\1", "", "z", "", "y", "-"],
+            x,
+            fixed=True,
+        ),
+        ["a.\\1", "AB", "xzb", "ab", None, "a-b"],
+    )
+
+    # the same results however many distinct patterns there are
+    x = ["a\n", "b\n", "c\n", "d\n"]
+    assert_iterable_equal(grepl(["[a]$", "[b]$", "[c]$", "[d]$"], x), [False] * 4)
+    assert_iterable_equal(grepl(["[a]$"] * 4, x), [False] * 4)
+    assert_iterable_equal(grepl("[a]$", x), [False] * 4)
+    assert_iterable_equal(grepl([r"\d", "x"], ["\u0663", "x"]), [False, True])
+    with pytest.raises(pa.ArrowInvalid):
+        grepl(["a(?=b)", "c"], ["ab", "c"])
+
+
+def test_vectorized_patterns_grouped():
+    # Few distinct patterns are applied by one kernel call for each
+    x = ["a.b", "A-B", "xab", "ab", None, "a+b"]
+    assert_iterable_equal(
+        grepl(["a", "b", "a", "b", "a", "b"], x, ignore_case=True),
+        [True, True, True, True, None, True],
+    )
+    assert_iterable_equal(
+        sub(["(a)"] * 3 + ["b"] * 3, ["<\\1>"] * 3 + ["\\\\"] * 3, x),
+        ["<a>.b", "A-B", "x<a>b", "a\\", None, "a+\\"],
+    )
 
 
 def test_strsplit():
@@ -105,6 +242,20 @@ def test_paste0():
     assert_equal(paste0(["a", "b"], ["c", "d"], collapse=","), "ac,bd")
 
 
+def test_paste_broadcast():
+    assert_iterable_equal(paste0("id_", [1, 2, 3]), ["id_1", "id_2", "id_3"])
+    assert_iterable_equal(
+        paste(["a", None], "x", sep="-"), ["a-x", "x"]
+    )
+    assert_equal(paste0("id_", [1, 2, 3], collapse="|"), "id_1|id_2|id_3")
+    assert_equal(paste0([], collapse=","), "")
+    assert_iterable_equal(paste(), [])
+    assert_iterable_equal(paste0(), [])
+    assert_equal(paste(collapse=","), "")
+    with pytest.raises(ValueError):
+        paste(["a", "b"], ["c", "d", "e"])
+
+
 def test_sprintf():
     assert_equal(sprintf("%s-%s", "a", "b"), "a-b")
     assert_iterable_equal(
@@ -124,6 +275,29 @@ def test_substring():
     assert_equal(substring("abc", -2, -1), "b")
 
 
+def test_substr_vectorized():
+    assert_iterable_equal(
+        substr(["abcdef", "xyz", NA], [0, 1, 2], [2, 10, 3]),
+        ["ab", "yz", NA],
+    )
+    assert_iterable_equal(
+        substring("abcdef", [0, 1, -2]), ["abcdef", "bcdef", "ef"]
+    )
+    assert_iterable_equal(substr(["abc", "abc"], [2, 0], [1, -1]), ["", "ab"])
+    assert_iterable_equal(substr(["abc", "abc"], [NA, 0], 2), [NA, "ab"])
+    # code points, not bytes
+    assert_iterable_equal(
+        substr(["héllo", "日本語", "ab😀cd"], [1, -2, 2], [3, 3, 3]),
+        ["él", "本語", "😀"],
+    )
+    # sliced arrays
+    x = pa.array(["zz", "abcd", "héllo"])[1:]
+    assert_iterable_equal(substr(x, [1, 1], [3, -1]), ["bc", "éll"])
+
+    with pytest.raises(ValueError):
+        substr(["a", "b"], [0, 1, 2], 1)
+
+
 def test_startswith():
     assert_equal(startswith("abc", "a"), True)
     # assert_iterable_equal(startswith("abc", ["a", "b"]), [True, False])
@@ -140,8 +314,42 @@ def test_strtoi():
     assert_iterable_equal(strtoi(["1", "2"]), [1, 2])
     assert_iterable_equal(strtoi(["a", "2"]), [NA, 2])
 
+    assert_equal(strtoi("077", base=8), 63)
+    assert_equal(strtoi("z", base=36), 35)
+    assert_iterable_equal(
+        strtoi(["ff", "0xFF", "-0x1a", "+12", "fg", "", None], base=16),
+        [255, 255, -26, 18, NA, NA, NA],
+    )
+    assert_iterable_equal(
+        strtoi(["0x1A", "012", "12", " -12", "08", "0x", "1 "]),
+        [26, 10, 12, -12, NA, NA, NA],
+    )
+    assert_iterable_equal(
+        strtoi(["1" * 63, "1" * 64, "0" * 70 + "101", "2" + "0" * 70], base=2),
+        [2**63 - 1, NA, 5, NA],
+    )
+    assert_iterable_equal(
+        strtoi(["9223372036854775807", "9223372036854775808"], base=10),
+        [2**63 - 1, NA],
+    )
+    assert_iterable_equal(strtoi(pa.array(["x", "10", "11"]).slice(1), 2), [2, 3])
+    # plain forms by the cast kernel, the others one by one
+    assert_iterable_equal(
+        strtoi(["7fffffffffffffff", "8000000000000000", "0x" + "0" * 20 + "1f"], 16),
+        [2**63 - 1, NA, 31],
+    )
+    assert_iterable_equal(
+        strtoi(["0x8000000000000000", "-0x10", "\t+0x10", "0", "-0", "007"]),
+        [NA, -16, 16, 0, 0, 7],
+    )
+    assert_iterable_equal(
+        strtoi(["-123", "1_0", "0x1f", "１２", None], 10), [-123, NA, NA, NA, NA]
+    )
+
+    with pytest.raises(ValueError):
+        strtoi("1", base=1)
     with pytest.raises(ValueError):
-        strtoi("1", base=8)
+        strtoi("1", base=37)
 
 
 def test_trimws():
@@ -166,6 +374,25 @@ def test_tolower():
 def test_chartr():
     assert_equal(chartr("a", "b", "abc"), "bbc")
     assert_iterable_equal(chartr("a", "b", ["a", "b"]), ["b", "b"])
+    # translated at once, not chained: a -> b, b -> a
+    assert_iterable_equal(
+        chartr("ab", "ba", ["abc", None, "", "été ab"]),
+        ["bac", None, "", "été ba"],
+    )
+    assert_iterable_equal(
+        chartr("ab", "ba", pa.array(["xx", "abc", "ab"]).slice(1)),
+        ["bac", "ba"],
+    )
+    assert_iterable_equal(chartr("éa", "eà", ["été a", None]), ["ete à", None])
+    # non-ASCII cycles and many pairs are translated on the UTF-8 buffer
+    assert_iterable_equal(
+        chartr("éa", "aé", pa.array(["x", "été a", None, "xé"]).slice(1)),
+        ["ata é", None, "xa"],
+    )
+    assert_iterable_equal(
+        chartr("éèàç€a", "eeac$€", ["crème à la €", "ça été", None, ""]),
+        ["creme a l€ $", "c€ ete", None, ""],
+    )
 
 
 def test_nchar():
@@ -192,3 +419,35 @@ def test_nzchar():
     assert_iterable_equal(
         nzchar(["a", "", None], keep_na=True), [True, False, None]
     )
+
+
+def test_factor_input():
+    f = factor([" a b", "c", " a b", NA, "10"])
+    assert_iterable_equal(toupper(f), [" A B", "C", " A B", NA, "10"])
+    assert_iterable_equal(trimws(f), ["a b", "c", "a b", NA, "10"])
+    assert_iterable_equal(grepl("a", f), [True, False, True, NA, False])
+    assert_iterable_equal(
+        grepl(["a", "c", "x", "y", "1"], f), [True, True, False, NA, True]
+    )
+    assert_iterable_equal(grep("a", f, value=True), [" a b", " a b"])
+    assert_iterable_equal(sub("a", "z", f), [" z b", "c", " z b", NA, "10"])
+    assert_iterable_equal(nchar(f, type_="chars"), [4, 1, 4, 2, 2])
+    assert_iterable_equal(
+        nchar(f, type_="chars", keep_na=True), [4, 1, 4, NA, 2]
+    )
+    assert_iterable_equal(nzchar(f), [True] * 5)
+    assert_iterable_equal(startswith(f, " "), [True, False, True, NA, False])
+    assert_iterable_equal(chartr("ab", "xy", f), [" x y", "c", " x y", NA, "10"])
+    assert_iterable_equal(strtoi(f), [NA, NA, NA, NA, 10])
+    assert_iterable_equal(substr(f, 0, 2), [" a", "c", " a", NA, "10"])
+    assert strsplit(f, " ").to_pylist()[:2] == [["", "a", "b"], ["c"]]
+
+    # raw dictionary arrays are not decoded to find their length
+    d = pa.array(["ab", "cd", "ab", None]).dictionary_encode()
+    assert_iterable_equal(grepl("a", d), [True, False, True, NA])
+    assert_iterable_equal(grepl(["a", "c", "x", "y"], d), [True, True, False, NA])
+    assert_iterable_equal(grep("a", d), [0, 2])
+    out = grep("a", d, value=True)
+    assert out.type == pa.string()
+    assert_iterable_equal(out, ["ab", "ab"])
+    assert_iterable_equal(sub(["a", "c", "b", "x"], "z", d), ["zb", "zd", "az", NA])
@@ -147,6 +147,8 @@ def test_tanh():
         [0.46211715726000974, 0.5370495669980353],
         approx=True,
     )
+    # e^x overflows here, tanh itself does not
+    assert_iterable_equal(tanh(make_array([1000.0, -1000.0])), [1.0, -1.0])
 
 
 def test_tanpi():